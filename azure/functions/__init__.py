@@ -5,7 +5,7 @@ from ._abc import TimerRequest, InputStream, Context, Out
 from ._eventhub import EventHubEvent
 from ._eventgrid import EventGridEvent, EventGridOutputEvent
 from ._cosmosdb import Document, DocumentList
-from ._http import HttpRequest, HttpResponse
+from ._http import HttpRequest, HttpResponse, StreamingHttpResponse
 from .decorators import (FunctionApp, Function, Blueprint,
                          DecoratorApi, DataType, AuthLevel,
                          Cardinality, AccessRights, HttpMethod,
@@ -20,6 +20,7 @@ from ._http_wsgi import WsgiMiddleware
 from ._http_asgi import AsgiMiddleware
 from .kafka import KafkaEvent, KafkaConverter, KafkaTriggerConverter
 from .meta import get_binding_registry
+from ._json import JsonCodec, get_json_codec, set_json_codec
 from ._queue import QueueMessage
 from ._servicebus import ServiceBusMessage
 from ._sql import SqlRow, SqlRowList
@@ -44,6 +45,8 @@ from . import mysql  # NoQA
 __all__ = (
     # Functions
     'get_binding_registry',
+    'get_json_codec',
+    'set_json_codec',
 
     # Generics.
     'Context',
@@ -58,6 +61,7 @@ __all__ = (
     'HttpRequest',
     'HttpResponse',
     'InputStream',
+    'JsonCodec',
     'KafkaEvent',
     'KafkaConverter',
     'KafkaTriggerConverter',
@@ -67,6 +71,7 @@ __all__ = (
     'ServiceBusMessage',
     'SqlRow',
     'SqlRowList',
+    'StreamingHttpResponse',
     'TimerRequest',
     'WarmUpContext',
     'MySqlRow',
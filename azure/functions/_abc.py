@@ -263,6 +263,8 @@ class InputStream(io.BufferedIOBase, abc.ABC):
 
 class QueueMessage(abc.ABC):
 
+    __slots__ = ()
+
     @property
     @abc.abstractmethod
     def id(self) -> typing.Optional[str]:
@@ -404,6 +406,8 @@ class DocumentList(abc.ABC):
 
 class EventHubEvent(abc.ABC):
 
+    __slots__ = ()
+
     @abc.abstractmethod
     def get_body(self) -> bytes:
         pass
@@ -443,6 +447,8 @@ class OrchestrationContext(abc.ABC):
 
 class ServiceBusMessage(abc.ABC):
 
+    __slots__ = ()
+
     @abc.abstractmethod
     def get_body(self) -> typing.Union[str, bytes]:
         pass
@@ -2,9 +2,8 @@
 # Licensed under the MIT License.
 
 import collections
-import json
 
-from . import _abc
+from . import _abc, _json
 
 
 class Document(_abc.Document, collections.UserDict):
@@ -16,16 +15,24 @@ class Document(_abc.Document, collections.UserDict):
     @classmethod
     def from_json(cls, json_data: str) -> 'Document':
         """Create a Document from a JSON string."""
-        return cls.from_dict(json.loads(json_data))
+        return cls.from_dict(_json.loads(json_data), copy=False)
 
     @classmethod
-    def from_dict(cls, dct: dict) -> 'Document':
-        """Create a Document from a dict object."""
+    def from_dict(cls, dct: dict, *, copy: bool = True) -> 'Document':
+        """Create a Document from a dict object.
+
+        With ``copy=False`` the Document adopts the dict instead of copying
+        it, later changes to either of them are shared.
+        """
+        if not copy and isinstance(dct, dict):
+            obj = cls.__new__(cls)
+            obj.data = dct
+            return obj
         return cls({k: v for k, v in dct.items()})
 
     def to_json(self) -> str:
         """Return the JSON representation of the document."""
-        return json.dumps(dict(self))
+        return _json.dumps(dict(self))
 
     def to_dict(self) -> dict:
         """Return the document as a dict - directly using self would also work
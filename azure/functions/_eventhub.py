@@ -11,6 +11,10 @@ from azure.functions import meta
 class EventHubEvent(func_abc.EventHubEvent):
     """A concrete implementation of Event Hub message type."""
 
+    __slots__ = ('__body', '__trigger_metadata', '__enqueued_time',
+                 '__partition_key', '__sequence_number', '__offset',
+                 '__iothub_metadata', '_trigger_metadata_pyobj')
+
     def __init__(self, *,
                  body: bytes,
                  trigger_metadata: typing.Optional[
@@ -75,9 +79,10 @@ class EventHubEvent(func_abc.EventHubEvent):
             return None
 
         if self._trigger_metadata_pyobj is None:
-            self._trigger_metadata_pyobj = {
-                k: v.python_value for (k, v) in self.__trigger_metadata.items()
-            }
+            # Values are decoded on first access, json values are decoded
+            # once per datum and shared with the other messages of a batch
+            self._trigger_metadata_pyobj = meta._DatumValueDict(
+                self.__trigger_metadata)
         return self._trigger_metadata_pyobj
 
     def __repr__(self) -> str:
@@ -4,11 +4,10 @@
 import collections.abc
 import http
 import io
-import json
 import types
 import typing
 
-from . import _abc
+from . import _abc, _json
 from ._thirdparty.werkzeug import datastructures as _wk_datastructures
 from ._thirdparty.werkzeug import formparser as _wk_parser
 from ._thirdparty.werkzeug import http as _wk_http
@@ -137,6 +136,80 @@ class HttpResponse(_abc.HttpResponse):
         return self.__body
 
 
+class StreamingHttpResponse(HttpResponse):
+    """An HTTP response object with a body produced in chunks.
+
+    :param body:
+        An iterable of str/bytes chunks.  str chunks are encoded with the
+        response charset.  Chunks can be consumed with :meth:`iter_body` as
+        they are produced, :meth:`get_body` buffers the remaining chunks
+        into a single bytes object.  Async iterables are not supported:
+        responses are encoded synchronously, from the thread running the
+        function's event loop, so an async body could not be awaited.
+
+    All other parameters are the same as for :class:`HttpResponse`.
+    """
+
+    def __init__(self,
+                 body: typing.Iterable[typing.Union[str, bytes]], *,
+                 status_code: typing.Optional[typing.Union[
+                     http.HTTPStatus, int
+                 ]] = None,
+                 headers: typing.Optional[typing.Mapping[str, str]] = None,
+                 mimetype: typing.Optional[str] = None,
+                 charset: typing.Optional[str] = None) -> None:
+        super().__init__(status_code=status_code, headers=headers,
+                         mimetype=mimetype, charset=charset)
+
+        if isinstance(body, collections.abc.AsyncIterable) \
+                and not isinstance(body, collections.abc.Iterable):
+            raise TypeError(
+                'streaming response body cannot be an async iterable, '
+                'collect the chunks in the function and return an '
+                'iterable instead')
+        if isinstance(body, (str, bytes, bytearray)) \
+                or not isinstance(body, collections.abc.Iterable):
+            raise TypeError(
+                f'streaming response body is expected to be an iterable, '
+                f'got {type(body).__name__}')
+
+        self.__chunks = body
+        self.__consumed = False
+        self.__body: typing.Optional[bytes] = None
+
+    def iter_body(self) -> typing.Iterator[bytes]:
+        """Iterate over the response body chunks as bytes."""
+        if self.__body is not None:
+            yield self.__body
+            return
+
+        self.__claim_chunks()
+        for chunk in self.__chunks:
+            yield self.__encode_chunk(chunk)
+
+    def get_body(self) -> bytes:
+        """Response body as a bytes object, buffering all the chunks."""
+        if self.__body is None:
+            self.__body = b''.join(self.iter_body())
+        return self.__body
+
+    def __claim_chunks(self):
+        if self.__consumed:
+            raise RuntimeError('response body has already been consumed')
+        self.__consumed = True
+
+    def __encode_chunk(self, chunk) -> bytes:
+        if isinstance(chunk, str):
+            return chunk.encode(self.charset)
+
+        if not isinstance(chunk, (bytes, bytearray, memoryview)):
+            raise TypeError(
+                f'response body chunk is expected to be either of '
+                f'str, bytes, or bytearray, got {type(chunk).__name__}')
+
+        return chunk if isinstance(chunk, bytes) else bytes(chunk)
+
+
 class HttpRequest(_abc.HttpRequest):
     """An HTTP request object.
 
@@ -210,8 +283,12 @@ class HttpRequest(_abc.HttpRequest):
     def get_body(self) -> bytes:
         return self.__body_bytes
 
+    def get_body_buffer(self) -> memoryview:
+        """Request body as a read-only memoryview, without copying it."""
+        return memoryview(self.get_body())
+
     def get_json(self) -> typing.Any:
-        return json.loads(self.__body_bytes.decode('utf-8'))
+        return _json.loads(self.__body_bytes)
 
     def _parse_form_data(self):
         if self.__form_parsed:
@@ -230,6 +307,7 @@ class HttpRequest(_abc.HttpRequest):
             _wk_datastructures.ImmutableMultiDict,
         )
 
+        # BytesIO shares the buffer of a bytes object until it is written
         body_stream = io.BytesIO(body)
 
         _, self.__form, self.__files = parser.parse(
@@ -1,20 +1,39 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, Iterator, List, Tuple, Optional, Any, Union
 import logging
 import asyncio
+import atexit
+import functools
+import queue
+import threading
+import weakref
+from concurrent.futures import Future
 from asyncio import Event, Queue
-from urllib.parse import ParseResult, urlparse
 from warnings import warn
 from wsgiref.headers import Headers
 
 from ._abc import Context
-from ._http import HttpRequest, HttpResponse
+from ._http import HttpRequest, HttpResponse, StreamingHttpResponse
 from ._http_wsgi import WsgiRequest
 
 ASGI_VERSION = "2.1"
 ASGI_SPEC_VERSION = "2.1"
+# Body chunks a streamed response buffers before the app has to wait for
+# the worker to consume them
+STREAM_QUEUE_SIZE = 4
+
+
+def _close_at_exit(middleware_ref: "weakref.ref[AsgiMiddleware]") -> None:
+    middleware = middleware_ref()
+    if middleware is not None:
+        middleware.close()
+
+
+@functools.lru_cache(maxsize=512)
+def _encode_header_name(name: str) -> bytes:
+    return name.encode("utf8")
 
 
 class AsgiRequest(WsgiRequest):
@@ -23,12 +42,11 @@ class AsgiRequest(WsgiRequest):
         self.asgi_version = ASGI_VERSION
         self.asgi_spec_version = ASGI_SPEC_VERSION
         self._headers = func_req.headers
-        url: ParseResult = urlparse(func_req.url)
-        self.asgi_url_scheme = url.scheme
         super().__init__(func_req, func_ctx)
+        self.asgi_url_scheme = self.wsgi_url_scheme
 
     def _get_encoded_http_headers(self) -> List[Tuple[bytes, bytes]]:
-        return [(k.encode("utf8"), v.encode("utf8"))
+        return [(_encode_header_name(k), v.encode("utf8"))
                 for k, v in self._headers.items()]
 
     def _get_server_address(self):
@@ -36,7 +54,34 @@ class AsgiRequest(WsgiRequest):
             return (self.server_name, int(self.server_port))
         return None
 
-    def to_asgi_http_scope(self):
+    @staticmethod
+    def build_scope_template() -> Dict[str, Any]:
+        """Build the part of the HTTP scope that is the same for every
+        request, to be passed to .to_asgi_http_scope() when converting many
+        requests.
+        """
+        return {
+            "type": "http",
+            "asgi.version": ASGI_VERSION,
+            "asgi.spec_version": ASGI_SPEC_VERSION,
+            "http_version": "1.1",
+            "root_path": "",
+            "client": None,
+        }
+
+    def _get_scope_template(self) -> Dict[str, Any]:
+        return {
+            "type": "http",
+            "asgi.version": self.asgi_version,
+            "asgi.spec_version": self.asgi_spec_version,
+            "http_version": "1.1",
+            "root_path": self.script_name,
+            "client": None,
+        }
+
+    def to_asgi_http_scope(self,
+                           scope_template: Optional[Dict[str, Any]] = None
+                           ) -> Dict[str, Any]:
         if self.path_info is not None:
             _raw_path = self.path_info.encode("utf-8")
         else:
@@ -46,20 +91,18 @@ class AsgiRequest(WsgiRequest):
         else:
             _query_string = b''
 
-        return {
-            "type": "http",
-            "asgi.version": self.asgi_version,
-            "asgi.spec_version": self.asgi_spec_version,
-            "http_version": "1.1",
+        if scope_template is None:
+            scope_template = self._get_scope_template()
+
+        scope = dict(scope_template)
+        scope.update({
             "method": self.request_method,
             "scheme": self.asgi_url_scheme,
             "path": self.path_info,
             "raw_path": _raw_path,
             "query_string": _query_string,
-            "root_path": self.script_name,
             "headers": self._get_encoded_http_headers(),
             "server": self._get_server_address(),
-            "client": None,
             "azure_functions.function_directory": self.af_function_directory,
             "azure_functions.function_name": self.af_function_name,
             "azure_functions.invocation_id": self.af_invocation_id,
@@ -67,8 +110,8 @@ class AsgiRequest(WsgiRequest):
                 self.af_thread_local_storage,
             "azure_functions.trace_context": self.af_trace_context,
             "azure_functions.retry_context": self.af_retry_context
-        }
-        # Notes, missing client name, port
+        })
+        return scope
 
 
 class AsgiResponse:
@@ -77,18 +120,110 @@ class AsgiResponse:
         self._headers: Union[Headers, Dict] = {}
         self._buffer: List[bytes] = []
         self._request_body: Optional[bytes] = b""
+        self._request_body_view: Optional[memoryview] = None
+        self._request_body_offset: int = 0
+        self._request_body_chunk_size: Optional[int] = None
         self._has_received_response: bool = False
+        self._response_complete: Optional[Event] = None
+        self._has_started: bool = False
+        self._chunk_queue: Optional["queue.Queue[Optional[bytes]]"] = None
+        self._response_started: Optional[threading.Event] = None
+        self._stream_closed: Optional[threading.Event] = None
+        self._app_future: Optional[Future] = None
 
     @classmethod
     async def from_app(cls, app, scope: Dict[str, Any],
-                       body: bytes) -> "AsgiResponse":
+                       body: bytes,
+                       request_body_chunk_size: Optional[int] = None
+                       ) -> "AsgiResponse":
         res = cls()
         res._request_body = body
+        res._request_body_chunk_size = request_body_chunk_size
+        # Created here so the event is bound to the loop running the app
+        res._response_complete = Event()
         await app(scope, res._receive, res._send)
         return res
 
+    @classmethod
+    def stream_from_app(cls, app, scope: Dict[str, Any], body: bytes,
+                        loop: asyncio.AbstractEventLoop,
+                        request_body_chunk_size: Optional[int] = None
+                        ) -> "AsgiResponse":
+        """Run the app on a loop owned by another thread and return as soon
+        as the response has started. The body chunks are handed over
+        through a bounded queue while the app keeps running, the app waits
+        in send() when the worker falls behind.
+        """
+        res = cls()
+        res._request_body_chunk_size = request_body_chunk_size
+        res._chunk_queue = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        res._response_started = threading.Event()
+        res._stream_closed = threading.Event()
+        res._app_future = asyncio.run_coroutine_threadsafe(
+            res._run_streaming(app, scope, body), loop)
+        res._response_started.wait()
+        if not res._has_started:
+            # Surface errors raised before the response has started
+            res._app_future.result()
+        return res
+
+    async def _run_streaming(self, app, scope: Dict[str, Any], body: bytes):
+        assert self._chunk_queue is not None
+        assert self._response_started is not None
+        self._request_body = body
+        self._response_complete = Event()
+        try:
+            await app(scope, self._receive, self._send)
+        finally:
+            self._response_started.set()
+            await self._put_chunk(None)
+
+    async def _put_chunk(self, chunk: Optional[bytes]):
+        assert self._chunk_queue is not None
+        try:
+            self._chunk_queue.put_nowait(chunk)
+        except queue.Full:
+            # Wait off the loop, other requests keep being served meanwhile
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._put_chunk_blocking, chunk)
+
+    def _put_chunk_blocking(self, chunk: Optional[bytes]):
+        assert self._chunk_queue is not None
+        assert self._stream_closed is not None
+        while not self._stream_closed.is_set():
+            try:
+                self._chunk_queue.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _iter_streamed_body(self) -> Iterator[bytes]:
+        assert self._chunk_queue is not None
+        assert self._stream_closed is not None
+        assert self._app_future is not None
+        try:
+            while True:
+                chunk = self._chunk_queue.get()
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            # Stop the app from waiting on a body nobody reads anymore
+            self._stream_closed.set()
+        # Surface errors raised while the body was being produced
+        self._app_future.result()
+
     def to_func_response(self) -> HttpResponse:
         lowercased_headers = {k.lower(): v for k, v in self._headers.items()}
+        if self._chunk_queue is not None:
+            return StreamingHttpResponse(
+                body=self._iter_streamed_body(),
+                status_code=self._status_code,
+                headers=self._headers,  # type: ignore
+                mimetype=lowercased_headers.get("content-type"),
+                charset=lowercased_headers.get("content-encoding"),
+            )
+
         return HttpResponse(
             body=b"".join(self._buffer),
             status_code=self._status_code,
@@ -102,25 +237,52 @@ class AsgiResponse:
             [(k.decode(), v.decode())
              for k, v in message["headers"]])
         self._status_code = message["status"]
+        self._has_started = True
+        if self._response_started:
+            self._response_started.set()
 
     def _handle_http_response_body(self, message: Dict[str, Any]):
-        self._buffer.append(message["body"])
+        if self._chunk_queue is None:
+            self._buffer.append(message.get("body", b""))
         self._has_received_response = not message.get("more_body", False)
-        # XXX : Chunked bodies not supported, see
-        # https://github.com/Azure/azure-functions-host/issues/4926
+        if self._has_received_response and self._response_complete:
+            self._response_complete.set()
+
+    def _next_request_body_chunk(self) -> Tuple[bytes, bool]:
+        assert self._request_body is not None
+        chunk_size = self._request_body_chunk_size
+        if not chunk_size or len(self._request_body) <= chunk_size:
+            body, self._request_body = self._request_body, None
+            return body, False
+
+        # Slice a view over the original body so that only the chunk
+        # handed to the app is copied, never the whole body
+        if self._request_body_view is None:
+            self._request_body_view = memoryview(self._request_body)
+        start = self._request_body_offset
+        end = start + chunk_size
+        chunk = bytes(self._request_body_view[start:end])
+        more_body = end < len(self._request_body_view)
+        self._request_body_offset = end
+        if not more_body:
+            self._request_body_view.release()
+            self._request_body_view = None
+            self._request_body = None
+        return chunk, more_body
 
     async def _receive(self):
         if self._request_body is not None:
-            reply = {
+            body, more_body = self._next_request_body_chunk()
+            return {
                 "type": "http.request",
-                "body": self._request_body,
-                "more_body": False,
+                "body": body,
+                "more_body": more_body,
             }
-            self._request_body = None
-            return reply
         else:
-            while not self._has_received_response:
-                await asyncio.sleep(0.1)
+            # Apps may call receive() again to watch for a disconnect, wake
+            # them as soon as the final response chunk has been sent
+            if not self._has_received_response and self._response_complete:
+                await self._response_complete.wait()
             return {
                 "type": "http.disconnect",
             }
@@ -130,6 +292,8 @@ class AsgiResponse:
         if message["type"] == "http.response.start":
             self._handle_http_response_start(message)
         elif message["type"] == "http.response.body":
+            if self._chunk_queue is not None and message.get("body"):
+                await self._put_chunk(message["body"])
             self._handle_http_response_body(message)
         elif message["type"] == "http.disconnect":
             pass  # Nothing todo here
@@ -143,7 +307,9 @@ class AsgiMiddleware:
     _logger = logging.getLogger('azure.functions.AsgiMiddleware')
     _usage_reported = False
 
-    def __init__(self, app):
+    def __init__(self, app, persistent_loop: bool = False,
+                 stream_response: bool = False,
+                 request_body_chunk_size: Optional[int] = None):
         """Instantiate an ASGI middleware to convert Azure Functions HTTP
         request into ASGI Python object. Example on handling ASGI app in a HTTP
         trigger by overwriting the .main() method:
@@ -153,18 +319,52 @@ class AsgiMiddleware:
         from FastapiApp import app
 
         main = func.AsgiMiddleware(app).main
+
+        By default, the synchronous .main() and .handle() run every request
+        in a new event loop. Set persistent_loop to True to run them in one
+        long-lived event loop on a dedicated thread instead, so loop-bound
+        resources (e.g. connection pools) can be reused across requests.
+        The ASGI app is notified of startup before the first request and of
+        shutdown when .close() is called, or when the interpreter exits.
+        Apps that do not support the lifespan protocol are served without
+        lifespan events.
+
+        Set stream_response to True, together with persistent_loop, to make
+        the synchronous .main() and .handle() return a StreamingHttpResponse
+        as soon as the response has started, whose body chunks are forwarded
+        while the ASGI app is still sending them.
+
+        Set request_body_chunk_size to deliver request bodies larger than
+        that many bytes as a sequence of http.request messages with
+        more_body=True, instead of a single message.
         """
+        if stream_response and not persistent_loop:
+            raise ValueError(
+                "stream_response requires persistent_loop to be enabled.")
+        if request_body_chunk_size is not None \
+                and request_body_chunk_size <= 0:
+            raise ValueError(
+                "request_body_chunk_size must be a positive integer.")
+
         if not self._usage_reported:
             self._logger.debug("Starting Azure Functions ASGI middleware.")
             self._usage_reported = True
 
         self._app = app
         self.main = self._handle
-        self.state = {}
+        self.state: Dict[str, Any] = {}
         self.lifespan_receive_queue: Optional[Queue] = None
         self.lifespan_startup_event: Optional[Event] = None
         self.lifespan_shutdown_event: Optional[Event] = None
         self._startup_succeeded = False
+        self._lifespan_unsupported = False
+        self._persistent_loop = persistent_loop
+        self._stream_response = stream_response
+        self._request_body_chunk_size = request_body_chunk_size
+        self._scope_template = AsgiRequest.build_scope_template()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
 
     def handle(self, req: HttpRequest, context: Optional[Context] = None):
         """Deprecated. Please use handle_async instead:
@@ -184,13 +384,72 @@ class AsgiMiddleware:
 
     def _handle(self, req, context):
         asgi_request = AsgiRequest(req, context)
-        scope = asgi_request.to_asgi_http_scope()
-        asgi_response = asyncio.run(
-            AsgiResponse.from_app(self._app, scope, req.get_body())
-        )
+        scope = asgi_request.to_asgi_http_scope(self._scope_template)
+        if self._persistent_loop and self._stream_response:
+            asgi_response = AsgiResponse.stream_from_app(
+                self._app, scope, req.get_body(), self._get_persistent_loop(),
+                self._request_body_chunk_size
+            )
+        elif self._persistent_loop:
+            loop = self._get_persistent_loop()
+            asgi_response = asyncio.run_coroutine_threadsafe(
+                AsgiResponse.from_app(self._app, scope, req.get_body(),
+                                      self._request_body_chunk_size),
+                loop
+            ).result()
+        else:
+            asgi_response = asyncio.run(
+                AsgiResponse.from_app(self._app, scope, req.get_body(),
+                                      self._request_body_chunk_size)
+            )
 
         return asgi_response.to_func_response()
 
+    def _get_persistent_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_persistent_loop, args=(loop,),
+                    name='azure-functions-asgi-loop', daemon=True)
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+                atexit.register(_close_at_exit, weakref.ref(self))
+                asyncio.run_coroutine_threadsafe(
+                    self.notify_startup(), loop).result()
+
+            if not (self._startup_succeeded or self._lifespan_unsupported):
+                raise RuntimeError("ASGI middleware startup failed.")
+            return self._loop
+
+    @staticmethod
+    def _run_persistent_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def close(self):
+        """Notify the ASGI app of shutdown and stop the event loop started
+        when persistent_loop is enabled. Does nothing if no loop is running.
+        """
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop, self._loop_thread = None, None
+
+        if loop is None or thread is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self.notify_shutdown(), loop).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+            # Lifespan signals are bound to the closed loop
+            self.lifespan_receive_queue = None
+            self.lifespan_startup_event = None
+            self.lifespan_shutdown_event = None
+
     async def handle_async(self,
                            req: HttpRequest,
                            context: Optional[Context] = None):
@@ -210,10 +469,9 @@ class AsgiMiddleware:
 
     async def _handle_async(self, req, context):
         asgi_request = AsgiRequest(req, context)
-        scope = asgi_request.to_asgi_http_scope()
-        asgi_response = await AsgiResponse.from_app(self._app,
-                                                    scope,
-                                                    req.get_body())
+        scope = asgi_request.to_asgi_http_scope(self._scope_template)
+        asgi_response = await AsgiResponse.from_app(
+            self._app, scope, req.get_body(), self._request_body_chunk_size)
         return asgi_response.to_func_response()
 
     async def _lifespan_receive(self):
@@ -257,6 +515,18 @@ class AsgiMiddleware:
             raise RuntimeError("notify_startup() must be called first.")
         try:
             await self._app(scope, self._lifespan_receive, self._lifespan_send)
+        except Exception:
+            if self.lifespan_startup_event.is_set():
+                raise
+            # The app does not support lifespan, the server must continue
+            # without sending lifespan events (ASGI lifespan spec)
+            self._lifespan_unsupported = True
+            self._logger.debug("ASGI app does not support lifespan.",
+                               exc_info=True)
+        else:
+            if not self.lifespan_startup_event.is_set():
+                self._lifespan_unsupported = True
+                self._logger.debug("ASGI app does not support lifespan.")
         finally:
             self.lifespan_startup_event.set()
             self.lifespan_shutdown_event.set()
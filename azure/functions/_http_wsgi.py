@@ -1,17 +1,38 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
-from typing import Dict, List, Optional, Any
+from typing import Dict, Generator, Iterator, List, Optional, Tuple, Any
+import asyncio
+import functools
+import io
+import itertools
 import logging
+import mmap
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO, StringIO
 from os import linesep
 from urllib.parse import ParseResult, urlparse, unquote_to_bytes
 from wsgiref.headers import Headers
 
 from ._abc import Context
-from ._http import HttpRequest, HttpResponse
+from ._http import HttpRequest, HttpResponse, StreamingHttpResponse
 from ._thirdparty.werkzeug._compat import string_types, wsgi_encoding_dance
 
 
+@functools.lru_cache(maxsize=512)
+def _get_environ_header_name(name: str) -> str:
+    # Content-Type -> HTTP_CONTENT_TYPE
+    return f'HTTP_{name.upper().replace("-", "_")}'
+
+
+def _encode_environ_value(value: str) -> str:
+    # Ensure WSGI string fits in IOS-8859-1 code points, ASCII strings are
+    # left untouched by the encoding dance
+    return value if value.isascii() else wsgi_encoding_dance(value)
+
+
 class WsgiRequest:
     _environ_cache: Optional[Dict[str, Any]] = None
 
@@ -25,6 +46,7 @@ class WsgiRequest:
         self._lowercased_headers = {
             k.lower(): v for k, v in func_req.headers.items()
         }
+        self._func_headers = func_req.headers
 
         # Implement interfaces for PEP 3333 environ
         self.request_method = getattr(func_req, 'method', None)
@@ -41,11 +63,6 @@ class WsgiRequest:
         self.server_port = str(self._get_port(url, self._lowercased_headers))
         self.server_protocol = 'HTTP/1.1'
 
-        # Propagate http request headers into HTTP_ environ
-        self._http_environ: Dict[str, str] = self._get_http_headers(
-            func_req.headers
-        )
-
         # Wsgi environ
         self.wsgi_version = (1, 0)
         self.wsgi_url_scheme = url.scheme
@@ -65,27 +82,58 @@ class WsgiRequest:
         self.af_trace_context = getattr(func_ctx, 'trace_context', None)
         self.af_retry_context = getattr(func_ctx, 'retry_context', None)
 
-    def to_environ(self, errors_buffer: StringIO) -> Dict[str, Any]:
+    @property
+    def _http_environ(self) -> Dict[str, str]:
+        # Propagate http request headers into HTTP_ environ, only computed
+        # when a WSGI environ is built
+        return self._get_http_headers(self._func_headers)
+
+    @staticmethod
+    def build_environ_template(multithread: bool = False) -> Dict[str, Any]:
+        """Build the part of the environ that is the same for every request,
+        to be passed to .to_environ() when converting many requests.
+        """
+        return {
+            'SCRIPT_NAME': '',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.version': (1, 0),
+            'wsgi.multithread': multithread,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            'wsgi.file_wrapper': FileWrapper,
+        }
+
+    def _get_environ_template(self) -> Dict[str, Any]:
+        return {
+            'SCRIPT_NAME': _encode_environ_value(self.script_name),
+            'SERVER_PROTOCOL': _encode_environ_value(self.server_protocol),
+            'wsgi.version': self.wsgi_version,
+            'wsgi.multithread': self.wsgi_multithread,
+            'wsgi.multiprocess': self.wsgi_multiprocess,
+            'wsgi.run_once': self.wsgi_run_once,
+            'wsgi.file_wrapper': FileWrapper,
+        }
+
+    def to_environ(self, errors_buffer: StringIO,
+                   environ_template: Optional[Dict[str, Any]] = None
+                   ) -> Dict[str, Any]:
         if self._environ_cache is not None:
             return self._environ_cache
 
-        environ = {
+        if environ_template is None:
+            environ_template = self._get_environ_template()
+
+        request_environ = {
             'REQUEST_METHOD': self.request_method,
-            'SCRIPT_NAME': self.script_name,
             'PATH_INFO': self.path_info,
             'QUERY_STRING': self.query_string,
             'CONTENT_TYPE': self.content_type,
             'CONTENT_LENGTH': self.content_length,
             'SERVER_NAME': self.server_name,
             'SERVER_PORT': self.server_port,
-            'SERVER_PROTOCOL': self.server_protocol,
-            'wsgi.version': self.wsgi_version,
             'wsgi.url_scheme': self.wsgi_url_scheme,
             'wsgi.input': self.wsgi_input,
             'wsgi.errors': errors_buffer,
-            'wsgi.multithread': self.wsgi_multithread,
-            'wsgi.multiprocess': self.wsgi_multiprocess,
-            'wsgi.run_once': self.wsgi_run_once,
             'azure_functions.function_directory': self.af_function_directory,
             'azure_functions.function_name': self.af_function_name,
             'azure_functions.invocation_id': self.af_invocation_id,
@@ -94,17 +142,18 @@ class WsgiRequest:
             'azure_functions.trace_context': self.af_trace_context,
             'azure_functions.retry_context': self.af_retry_context
         }
-        environ.update(self._http_environ)
-
-        # Ensure WSGI string fits in IOS-8859-1 code points
-        for k, v in environ.items():
-            if isinstance(v, string_types):
-                environ[k] = wsgi_encoding_dance(v)
-
-        # Remove None values
-        self._environ_cache = {
-            k: v for k, v in environ.items() if v is not None
-        }
+        request_environ.update(self._http_environ)
+
+        # Start from a copy of the constant keys, and only fill in the
+        # ones specific to this request, removing None values
+        environ = dict(environ_template)
+        for k, v in request_environ.items():
+            if v is None:
+                continue
+            environ[k] = (_encode_environ_value(v)
+                          if isinstance(v, string_types) else v)
+
+        self._environ_cache = environ
         return self._environ_cache
 
     def _get_port(self, parsed_url, lowercased_headers: Dict[str, str]) -> int:
@@ -120,25 +169,127 @@ class WsgiRequest:
     def _get_http_headers(self,
                           func_headers: Dict[str, str]) -> Dict[str, str]:
         # Content-Type -> HTTP_CONTENT_TYPE
-        return {f'HTTP_{k.upper().replace("-", "_")}': v for k, v in
+        return {_get_environ_header_name(k): v for k, v in
                 func_headers.items()}
 
 
+class FileWrapper:
+    """PEP 3333 wsgi.file_wrapper implementation. Regular files are memory
+    mapped, so they are read straight from the page cache without going
+    through intermediate read buffers.
+    """
+
+    def __init__(self, filelike, blksize: int = 8192):
+        self.filelike = filelike
+        self.blksize = blksize
+        if hasattr(filelike, 'close'):
+            self.close = filelike.close
+
+    def __iter__(self) -> Iterator[bytes]:
+        mapped = self._map()
+        if mapped is None:
+            read = self.filelike.read
+            chunk = read(self.blksize)
+            while chunk:
+                yield chunk
+                chunk = read(self.blksize)
+            return
+
+        mm, offset = mapped
+        try:
+            for start in range(offset, len(mm), self.blksize):
+                yield mm[start:start + self.blksize]
+        finally:
+            mm.close()
+
+    def read_all(self) -> bytes:
+        """Read the rest of the file with a single copy."""
+        mapped = self._map()
+        if mapped is None:
+            data: bytes = self.filelike.read()
+            return data
+
+        mm, offset = mapped
+        try:
+            return mm[offset:]
+        finally:
+            mm.close()
+
+    def _map(self) -> Optional[Tuple[mmap.mmap, int]]:
+        try:
+            fileno = self.filelike.fileno()
+            if not stat.S_ISREG(os.fstat(fileno).st_mode):
+                return None
+            offset = self.filelike.tell()
+            return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ), offset
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            # Not backed by a regular file, or an empty one which cannot
+            # be mapped
+            return None
+
+
 class WsgiResponse:
     def __init__(self):
         self._status = ''
         self._status_code = 0
         self._headers = {}
         self._buffer: List[bytes] = []
+        self._app_iter: Optional[Generator[bytes, None, None]] = None
 
     @classmethod
     def from_app(cls, app, environ) -> 'WsgiResponse':
         res = cls()
-        res._buffer = [x or b'' for x in app(environ, res._start_response)]
+        app_response = app(environ, res._start_response)
+        try:
+            if isinstance(app_response, FileWrapper):
+                res._buffer = [app_response.read_all()]
+            else:
+                res._buffer = [x or b'' for x in app_response]
+        finally:
+            if hasattr(app_response, 'close'):
+                app_response.close()
+        return res
+
+    @classmethod
+    def stream_from_app(cls, app, environ) -> 'WsgiResponse':
+        res = cls()
+        app_iter = cls._iter_app_response(app(environ, res._start_response))
+
+        # start_response() may be deferred until the first non-empty chunk
+        # is yielded, so the status and headers are only known after it
+        first_chunk = next((x for x in app_iter if x), None)
+        if first_chunk is not None:
+            res._buffer.append(first_chunk)
+        res._app_iter = app_iter
         return res
 
+    @staticmethod
+    def _iter_app_response(app_response) -> Generator[bytes, None, None]:
+        try:
+            for chunk in app_response:
+                yield chunk
+        finally:
+            # PEP 3333 requires close() to be called once the response
+            # has been consumed, or abandoned
+            if hasattr(app_response, 'close'):
+                app_response.close()
+
+    def close(self):
+        if self._app_iter is not None:
+            self._app_iter.close()
+
     def to_func_response(self) -> HttpResponse:
         lowercased_headers = {k.lower(): v for k, v in self._headers.items()}
+        if self._app_iter is not None:
+            return StreamingHttpResponse(
+                body=itertools.chain(self._buffer,
+                                     (x or b'' for x in self._app_iter)),
+                status_code=self._status_code,
+                headers=self._headers,
+                mimetype=lowercased_headers.get('content-type'),
+                charset=lowercased_headers.get('content-encoding')
+            )
+
         return HttpResponse(
             body=b''.join(self._buffer),
             status_code=self._status_code,
@@ -162,7 +313,9 @@ class WsgiMiddleware:
     _logger = logging.getLogger('azure.functions.WsgiMiddleware')
     _usage_reported = False
 
-    def __init__(self, app):
+    def __init__(self, app, stream_response: bool = False,
+                 multithread: bool = False,
+                 max_workers: Optional[int] = None):
         """Instantiate a WSGI middleware to convert Azure Functions HTTP
         request into WSGI Python object. Example on handling WSGI app in a HTTP
         trigger by overwriting the .main() method:
@@ -172,13 +325,33 @@ class WsgiMiddleware:
         from FlaskApp import app
 
         main = func.WsgiMiddleware(app.wsgi_app).main
+
+        Set stream_response to True to return a StreamingHttpResponse that
+        iterates over the WSGI app response lazily instead of buffering it.
+        Only errors written to wsgi.errors before the first body chunk is
+        produced are reported in this mode.
+
+        Set multithread to True if the WSGI app can be called concurrently
+        from several threads, which is reported to it as wsgi.multithread.
+        .handle_async() then runs the app in a thread pool bounded to
+        max_workers threads. Otherwise the app is called for one request at
+        a time, from .handle(), .main() and .handle_async() alike; with
+        stream_response the body is still iterated after the call returns.
         """
         if not self._usage_reported:
             self._logger.info("Instantiating Azure Functions WSGI middleware.")
             self._usage_reported = True
 
         self._app = app
-        self._wsgi_error_buffer = StringIO()
+        self._stream_response = stream_response
+        self._multithread = multithread
+        self._environ_template = WsgiRequest.build_environ_template(
+            multithread)
+        self._max_workers = max_workers if multithread else 1
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._app_lock: Optional[threading.Lock] = \
+            None if multithread else threading.Lock()
         self.main = self._handle
 
     def handle(self, req: HttpRequest, context: Optional[Context] = None):
@@ -195,20 +368,76 @@ class WsgiMiddleware:
         """
         return self._handle(req, context)
 
+    async def handle_async(self,
+                           req: HttpRequest,
+                           context: Optional[Context] = None):
+        """Method to convert an Azure Functions HTTP request into a WSGI
+        Python object from an async function. The WSGI app runs in a thread
+        pool owned by the middleware, so that it does not block the event
+        loop:
+
+        import azure.functions as func
+
+        from FlaskApp import app
+
+        middleware = func.WsgiMiddleware(app.wsgi_app, multithread=True)
+
+        async def main(req, context):
+            return await middleware.handle_async(req, context)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), self._handle, req, context)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix='azure-functions-wsgi')
+            return self._executor
+
+    def close(self):
+        """Shut down the thread pool used by .handle_async(), waiting for
+        the requests it is running to complete.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
     def _handle(self, req, context):
+        if self._app_lock is None:
+            return self._handle_request(req, context)
+        with self._app_lock:
+            return self._handle_request(req, context)
+
+    def _handle_request(self, req, context):
         wsgi_request = WsgiRequest(req, context)
-        environ = wsgi_request.to_environ(self._wsgi_error_buffer)
-        wsgi_response = WsgiResponse.from_app(self._app, environ)
-        self._handle_errors(wsgi_response)
+        wsgi_request.wsgi_multithread = self._multithread
+        # Each request gets its own error stream, so that errors logged by
+        # concurrent requests are not reported on each other
+        errors_buffer = StringIO()
+        environ = wsgi_request.to_environ(errors_buffer,
+                                          self._environ_template)
+        if self._stream_response:
+            wsgi_response = WsgiResponse.stream_from_app(self._app, environ)
+        else:
+            wsgi_response = WsgiResponse.from_app(self._app, environ)
+        self._handle_errors(wsgi_response, errors_buffer)
         return wsgi_response.to_func_response()
 
-    def _handle_errors(self, wsgi_response):
-        if self._wsgi_error_buffer.tell() > 0:
-            self._wsgi_error_buffer.seek(0)
+    def _handle_errors(self, wsgi_response, errors_buffer: StringIO):
+        if errors_buffer.tell() > 0:
+            wsgi_response.close()
+            errors_buffer.seek(0)
             error_message = linesep.join(
-                self._wsgi_error_buffer.readline()
+                errors_buffer.readline()
             )
             raise Exception(error_message)
 
         if wsgi_response._status_code >= 500:
+            if wsgi_response._app_iter is not None:
+                wsgi_response._buffer.extend(
+                    x or b'' for x in wsgi_response._app_iter)
             raise Exception(b''.join(wsgi_response._buffer))
@@ -0,0 +1,160 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import json
+from typing import Any, Dict, Optional, Type, Union, cast
+
+
+class JsonCodec:
+    """JSON codec used by the bindings to decode and encode JSON payloads.
+
+    The default implementation uses the standard library ``json`` module.
+    Subclasses override :meth:`loads` and :meth:`dumps`, and
+    :meth:`dumps_bytes` when the underlying library produces UTF-8 bytes
+    directly.  Decoding errors must be raised as ``ValueError`` and
+    encoding errors as ``TypeError``, like the ``json`` module does.
+    """
+
+    name = 'json'
+
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        """Deserialize a str or UTF-8 encoded bytes JSON document."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        """Serialize an object to a JSON str."""
+        return json.dumps(obj)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """Serialize an object to UTF-8 encoded JSON bytes."""
+        return self.dumps(obj).encode('utf-8')
+
+
+class _OrjsonCodec(JsonCodec):
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._orjson.dumps(obj).decode('utf-8')
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+
+class _UjsonCodec(JsonCodec):
+
+    name = 'ujson'
+
+    def __init__(self) -> None:
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return cast(str, self._ujson.dumps(obj,
+                                           escape_forward_slashes=False))
+
+
+class _MsgspecCodec(JsonCodec):
+
+    name = 'msgspec'
+
+    def __init__(self) -> None:
+        import msgspec
+        self._msgspec = msgspec
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        try:
+            return cast(bytes, self._encoder.encode(obj))
+        except self._msgspec.EncodeError as e:
+            raise TypeError(str(e)) from e
+
+
+_CODECS: Dict[str, Type[JsonCodec]] = {
+    JsonCodec.name: JsonCodec,
+    _OrjsonCodec.name: _OrjsonCodec,
+    _UjsonCodec.name: _UjsonCodec,
+    _MsgspecCodec.name: _MsgspecCodec,
+}
+
+# Preference order of the codecs picked by set_json_codec('auto')
+_AUTO_CODECS = (_OrjsonCodec.name, _MsgspecCodec.name, _UjsonCodec.name)
+
+_codec: JsonCodec = JsonCodec()
+
+
+def set_json_codec(codec: Optional[Union[str, JsonCodec]]) -> JsonCodec:
+    """Set the JSON codec used by all the binding converters.
+
+    :param codec: A :class:`JsonCodec` instance, or the name of a supported
+        library: ``'json'``, ``'orjson'``, ``'ujson'`` or ``'msgspec'``.
+        ``'auto'`` picks the fastest of these libraries that is installed,
+        ``None`` restores the standard library ``json`` module.
+
+    :return: The codec now in use.
+    """
+    global _codec
+
+    if codec is None:
+        new_codec: JsonCodec = JsonCodec()
+    elif isinstance(codec, JsonCodec):
+        new_codec = codec
+    elif codec == 'auto':
+        new_codec = JsonCodec()
+        for name in _AUTO_CODECS:
+            try:
+                new_codec = _CODECS[name]()
+            except ImportError:
+                continue
+            break
+    elif codec in _CODECS:
+        try:
+            new_codec = _CODECS[codec]()
+        except ImportError as e:
+            raise ValueError(
+                f'cannot use the {codec!r} JSON codec: the {codec!r} '
+                f'package is not installed') from e
+    else:
+        raise ValueError(
+            f'unsupported JSON codec {codec!r}, expected one of: '
+            f'{", ".join(_CODECS)}, auto')
+
+    _codec = new_codec
+    return _codec
+
+
+def get_json_codec() -> JsonCodec:
+    """Return the JSON codec used by the binding converters."""
+    return _codec
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    return _codec.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    return _codec.dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return _codec.dumps_bytes(obj)
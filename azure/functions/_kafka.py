@@ -7,6 +7,8 @@ import typing
 
 class AbstractKafkaEvent(abc.ABC):
 
+    __slots__ = ()
+
     @abc.abstractmethod
     def get_body(self) -> bytes:
         pass
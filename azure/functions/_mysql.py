@@ -2,7 +2,8 @@
 # Licensed under the MIT License.
 import abc
 import collections
-import json
+
+from . import _json
 
 
 class BaseMySqlRow(abc.ABC):
@@ -43,16 +44,24 @@ class MySqlRow(BaseMySqlRow, collections.UserDict):
     @classmethod
     def from_json(cls, json_data: str) -> 'BaseMySqlRow':
         """Create a MySqlRow from a JSON string."""
-        return cls.from_dict(json.loads(json_data))
+        return cls.from_dict(_json.loads(json_data), copy=False)
 
     @classmethod
-    def from_dict(cls, dct: dict) -> 'BaseMySqlRow':
-        """Create a MySqlRow from a dict object"""
+    def from_dict(cls, dct: dict, *, copy: bool = True) -> 'BaseMySqlRow':
+        """Create a MySqlRow from a dict object.
+
+        With ``copy=False`` the MySqlRow adopts the dict instead of copying
+        it, later changes to either of them are shared.
+        """
+        if not copy and isinstance(dct, dict):
+            obj = cls.__new__(cls)
+            obj.data = dct
+            return obj
         return cls({k: v for k, v in dct.items()})
 
     def to_json(self) -> str:
         """Return the JSON representation of the MySqlRow"""
-        return json.dumps(dict(self))
+        return _json.dumps(dict(self))
 
     def __getitem__(self, key):
         return collections.UserDict.__getitem__(self, key)
@@ -2,10 +2,9 @@
 # Licensed under the MIT License.
 
 import datetime
-import json
 import typing
 
-from . import _abc
+from . import _abc, _json
 
 
 class QueueMessage(_abc.QueueMessage):
@@ -21,6 +20,8 @@ class QueueMessage(_abc.QueueMessage):
         An optional string containing the pop receipt token.
     """
 
+    __slots__ = ('__id', '__body', '__pop_receipt')
+
     def __init__(self, *,
                  id: typing.Optional[str] = None,
                  body: typing.Optional[typing.Union[str, bytes]] = None,
@@ -86,7 +87,7 @@ class QueueMessage(_abc.QueueMessage):
         :raises ValueError:
             when the body of the message does not contain valid JSON data.
         """
-        return json.loads(self.__body)
+        return _json.loads(self.__body)
 
     def __repr__(self) -> str:
         return (
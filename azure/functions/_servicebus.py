@@ -22,6 +22,8 @@ class ServiceBusMessage(_abc.ServiceBusMessage):
 
     """
 
+    __slots__ = ('__body', '__content_type', '__correlation_id')
+
     def __init__(self, *,
                  body: Optional[Union[str, bytes]] = None,
                  content_type: Optional[str] = None,
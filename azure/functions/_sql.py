@@ -2,7 +2,8 @@
 # Licensed under the MIT License.
 import abc
 import collections
-import json
+
+from . import _json
 
 
 class BaseSqlRow(abc.ABC):
@@ -43,16 +44,24 @@ class SqlRow(BaseSqlRow, collections.UserDict):
     @classmethod
     def from_json(cls, json_data: str) -> 'BaseSqlRow':
         """Create a SqlRow from a JSON string."""
-        return cls.from_dict(json.loads(json_data))
+        return cls.from_dict(_json.loads(json_data), copy=False)
 
     @classmethod
-    def from_dict(cls, dct: dict) -> 'BaseSqlRow':
-        """Create a SqlRow from a dict object"""
+    def from_dict(cls, dct: dict, *, copy: bool = True) -> 'BaseSqlRow':
+        """Create a SqlRow from a dict object.
+
+        With ``copy=False`` the SqlRow adopts the dict instead of copying
+        it, later changes to either of them are shared.
+        """
+        if not copy and isinstance(dct, dict):
+            obj = cls.__new__(cls)
+            obj.data = dct
+            return obj
         return cls({k: v for k, v in dct.items()})
 
     def to_json(self) -> str:
         """Return the JSON representation of the SqlRow"""
-        return json.dumps(dict(self))
+        return _json.dumps(dict(self))
 
     def __getitem__(self, key):
         return collections.UserDict.__getitem__(self, key)
@@ -1,21 +1,147 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
+import codecs
+import collections.abc
+import csv
+import gzip
 import io
-from typing import Any, Optional, Union
+import mmap
+import os
+import tempfile
+from typing import (Any, Dict, Iterable, Iterator, List, Optional, TypeVar,
+                    Union)
 
 from azure.functions import _abc as azf_abc
+from . import _json
 from . import meta
 
+T = TypeVar('T')
+
+# App setting with the UTF-8 encoded size above which string blob payloads
+# are spilled to a memory-mapped temporary file instead of being encoded in
+# memory.
+_SPILL_THRESHOLD_SETTING = 'PYTHON_BLOB_SPILL_THRESHOLD_BYTES'
+
+# Number of characters encoded at a time when spilling a 'string' payload.
+_SPILL_CHUNK_SIZE = 1 << 20
+
+# Size of the chunks read by the InputStream record iterators.
+_READ_CHUNK_SIZE = 1 << 16
+
+# Size of the chunks read from file-like objects and paths on output.
+_OUTPUT_CHUNK_SIZE = 1 << 20
+
+_COMPRESSIONS = ('gzip',)
+
+_spill_threshold: Optional[int] = None
+
+
+def set_spill_threshold(threshold: Optional[int]) -> None:
+    """Set the size above which string blob payloads are spilled to disk.
+
+    String payloads larger than *threshold* bytes once UTF-8 encoded are
+    encoded chunk by chunk into a temporary file and the
+    :class:`InputStream` reads from a read-only memory map of that file.
+    The datum keeps the str payload in memory for the whole invocation,
+    spilling only avoids holding its UTF-8 encoded copy in memory as well.
+
+    Bytes payloads are never spilled: the datum keeps referencing them for
+    the whole invocation, so writing them to a file would not release any
+    memory.  The temporary file is created in :func:`tempfile.gettempdir`,
+    when it is a tmpfs (as ``/tmp`` often is in containers) the file is
+    itself held in memory.
+
+    :param threshold: The UTF-8 encoded size in bytes, or ``None`` to use
+        the ``PYTHON_BLOB_SPILL_THRESHOLD_BYTES`` app setting.  Spilling is
+        disabled when neither is set.
+    """
+    global _spill_threshold
+
+    if threshold is not None and threshold < 0:
+        raise ValueError(
+            f'the blob spill threshold cannot be negative: {threshold!r}')
+    _spill_threshold = threshold
+
+
+def get_spill_threshold() -> Optional[int]:
+    """Return the size above which string blob payloads are spilled."""
+    if _spill_threshold is not None:
+        return _spill_threshold
+
+    setting = os.environ.get(_SPILL_THRESHOLD_SETTING)
+    if not setting:
+        return None
+    try:
+        return max(int(setting), 0)
+    except ValueError:
+        return None
+
+
+def _utf8_size_exceeds(value: str, size: int) -> bool:
+    # Each character takes 1 to 4 bytes, only encode when that is not enough
+    # to decide, and then one chunk at a time
+    if len(value) > size:
+        return True
+    if len(value) * 4 <= size or value.isascii():
+        return False
+    encoded_size = 0
+    for i in range(0, len(value), _SPILL_CHUNK_SIZE):
+        encoded_size += len(value[i:i + _SPILL_CHUNK_SIZE].encode('utf-8'))
+        if encoded_size > size:
+            return True
+    return False
+
+
+def _spill_to_mmap(value: str) -> mmap.mmap:
+    with tempfile.TemporaryFile() as f:
+        for i in range(0, len(value), _SPILL_CHUNK_SIZE):
+            f.write(value[i:i + _SPILL_CHUNK_SIZE].encode('utf-8'))
+        f.flush()
+        # The mapping keeps its own handle on the (already unlinked) file.
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _check_positive(name: str, value: Optional[int]) -> None:
+    if value is not None and value <= 0:
+        raise ValueError(f'{name} must be a positive integer, got {value!r}')
+
+
+def _batched(records: Iterable[T],
+             batch_size: Optional[int]) -> Iterator[Union[T, List[T]]]:
+    if batch_size is None:
+        yield from records
+        return
+
+    batch: List[T] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 
 class InputStream(azf_abc.InputStream):
-    def __init__(self, *, data: Union[bytes, meta.Datum],
+    """A seekable input blob stream over the blob content.
+
+    The content is not copied: the stream reads from a memoryview of the
+    bytes-like object it is given, :meth:`readinto` copies straight into the
+    caller's buffer and :meth:`getbuffer` exposes the content itself.
+    Large payloads may be backed by a memory-mapped temporary file, which
+    is unmapped when the stream is closed.
+    """
+
+    def __init__(self, *, data: Union[bytes, mmap.mmap, meta.Datum],
                  name: Optional[str] = None,
                  uri: Optional[str] = None,
                  length: Optional[int] = None,
                  blob_properties: Optional[dict] = None,
                  metadata: Optional[dict] = None) -> None:
-        self._io = io.BytesIO(data)  # type: ignore
+        self._data = data
+        self._buffer = memoryview(data).cast('B')  # type: ignore
+        self._pos = 0
         self._name = name
         self._length = length
         self._uri = uri
@@ -43,20 +169,262 @@ class InputStream(azf_abc.InputStream):
         return self._metadata
 
     def read(self, size=-1) -> bytes:
-        return self._io.read(size)
+        self._check_not_closed()
+        start = min(self._pos, len(self._buffer))
+        if size is None or size < 0:
+            end = len(self._buffer)
+        else:
+            end = min(start + size, len(self._buffer))
+        self._pos = end
+        return bytes(self._buffer[start:end])
 
     # implemented read1 method using aliasing.
     read1 = read
 
+    def readinto(self, buffer) -> int:
+        """Read bytes into a pre-allocated, writable bytes-like object.
+
+        :return: The number of bytes read, 0 at the end of the blob.
+        """
+        self._check_not_closed()
+        with memoryview(buffer) as view, view.cast('B') as target:
+            start = min(self._pos, len(self._buffer))
+            end = min(start + len(target), len(self._buffer))
+            target[:end - start] = self._buffer[start:end]
+        self._pos = end
+        return end - start
+
+    readinto1 = readinto
+
+    def readline(self, size=-1) -> bytes:
+        self._check_not_closed()
+        start = min(self._pos, len(self._buffer))
+        end = self._find(b'\n', start)
+        end = len(self._buffer) if end < 0 else end + 1
+        if size is not None and size >= 0:
+            end = min(end, start + size)
+        self._pos = end
+        return bytes(self._buffer[start:end])
+
+    def getbuffer(self) -> memoryview:
+        """Return a read-only view of the whole blob content."""
+        self._check_not_closed()
+        return self._buffer.toreadonly()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._check_not_closed()
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._buffer) + offset
+        else:
+            raise ValueError(f'invalid whence ({whence}, should be '
+                             f'{io.SEEK_SET}, {io.SEEK_CUR} or {io.SEEK_END})')
+        if pos < 0:
+            raise ValueError(f'negative seek position {pos}')
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        self._check_not_closed()
+        return self._pos
+
     def readable(self) -> bool:
         return True
 
     def seekable(self) -> bool:
-        return False
+        return True
 
     def writable(self) -> bool:
         return False
 
+    def iter_lines(self, *, keepends: bool = False,
+                   chunk_size: int = _READ_CHUNK_SIZE) -> Iterator[bytes]:
+        """Iterate over the lines from the current position.
+
+        The blob is read in chunks of *chunk_size* bytes into a single
+        reused buffer, lines spanning two chunks are joined.
+
+        :param keepends: Keep the ``\\n`` or ``\\r\\n`` line endings.
+        :param chunk_size: The number of bytes read at a time.
+        """
+        _check_positive('chunk_size', chunk_size)
+        return self._iter_lines(keepends, chunk_size)
+
+    def _iter_lines(self, keepends: bool,
+                    chunk_size: int) -> Iterator[bytes]:
+        chunk = bytearray(chunk_size)
+        pending = bytearray()
+        with memoryview(chunk) as view:
+            while True:
+                size = self.readinto(view)
+                if not size:
+                    break
+                start = 0
+                while True:
+                    end = chunk.find(b'\n', start, size) + 1
+                    if not end:
+                        break
+                    if pending:
+                        pending += view[start:end]
+                        line = bytes(pending)
+                        pending.clear()
+                    else:
+                        line = bytes(view[start:end])
+                    yield line if keepends else self._strip_eol(line)
+                    start = end
+                pending += view[start:size]
+
+        if pending:
+            line = bytes(pending)
+            yield line if keepends else self._strip_eol(line)
+
+    def iter_jsonl(self, *, batch_size: Optional[int] = None,
+                   chunk_size: int = _READ_CHUNK_SIZE) -> Iterator[Any]:
+        """Iterate over the JSON values of a JSON Lines (NDJSON) blob.
+
+        Blank lines are skipped and the values are decoded with the JSON
+        codec set by :func:`azure.functions.set_json_codec`.
+
+        :param batch_size: Yield lists of up to *batch_size* values instead
+            of single values.
+        :param chunk_size: The number of bytes read at a time.
+        """
+        _check_positive('batch_size', batch_size)
+        records = (_json.loads(line)
+                   for line in self.iter_lines(chunk_size=chunk_size)
+                   if line.strip())
+        return _batched(records, batch_size)
+
+    def iter_csv(self, *, encoding: str = 'utf-8',
+                 batch_size: Optional[int] = None,
+                 chunk_size: int = _READ_CHUNK_SIZE,
+                 **fmtparams) -> Iterator[Any]:
+        """Iterate over the rows of a CSV blob as lists of str.
+
+        Quoted fields may contain line breaks.  The blob is decoded with an
+        incremental decoder, so encodings where a line break takes more than
+        one byte (e.g. UTF-16) are supported.
+
+        :param encoding: The text encoding of the blob.
+        :param batch_size: Yield lists of up to *batch_size* rows instead
+            of single rows.
+        :param chunk_size: The number of bytes read at a time.
+        :param fmtparams: Formatting parameters passed to
+            :func:`csv.reader`.
+        """
+        _check_positive('chunk_size', chunk_size)
+        _check_positive('batch_size', batch_size)
+        # Fail now on unknown encodings rather than on the first row
+        codecs.lookup(encoding)
+        return _batched(self._iter_csv(encoding, chunk_size, fmtparams),
+                        batch_size)
+
+    def _iter_csv(self, encoding: str, chunk_size: int,
+                  fmtparams: Dict[str, Any]) -> Iterator[List[str]]:
+        # newline='' leaves the line breaks inside quoted fields to the csv
+        # module
+        text = io.TextIOWrapper(self, encoding=encoding, newline='')
+        text._CHUNK_SIZE = chunk_size  # type: ignore
+        try:
+            yield from csv.reader(text, **fmtparams)
+        finally:
+            # Keep the blob stream open once the rows are read
+            text.detach()
+
+    @staticmethod
+    def _strip_eol(line: bytes) -> bytes:
+        if line.endswith(b'\r\n'):
+            return line[:-2]
+        if line.endswith(b'\n'):
+            return line[:-1]
+        return line
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        super().close()
+        self._buffer.release()
+        if isinstance(self._data, mmap.mmap):
+            try:
+                self._data.close()
+            except BufferError:
+                # Views returned by getbuffer() are still alive, the mapping
+                # is released when they are garbage collected.
+                pass
+
+    def _find(self, sub: bytes, start: int) -> int:
+        find = getattr(self._data, 'find', None)
+        if find is not None:
+            return int(find(sub, start))
+        # Search in bounded windows, overlapping by len(sub) - 1 bytes so
+        # that a match spanning two windows is found
+        overlap = len(sub) - 1
+        for window in range(start, len(self._buffer), _READ_CHUNK_SIZE):
+            pos = bytes(
+                self._buffer[window:window + _READ_CHUNK_SIZE + overlap]
+            ).find(sub)
+            if pos >= 0:
+                return window + pos
+        return -1
+
+    def _check_not_closed(self) -> None:
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+
+
+class CompressedOutput:
+    """Blob output content compressed while it is encoded.
+
+    The content is compressed chunk by chunk, so that only the compressed
+    blob is held in memory.
+
+    :param content: The blob content: str, bytes-like, a binary file-like
+        object, an ``os.PathLike`` path or an iterable of str or bytes-like
+        chunks.
+    :param compression: The compression format, only ``'gzip'`` is
+        supported.
+    :param compresslevel: The compression level, from 0 to 9.
+    """
+
+    def __init__(self, content: Any, *, compression: str = 'gzip',
+                 compresslevel: int = 9) -> None:
+        if compression not in _COMPRESSIONS:
+            raise ValueError(
+                f'unsupported blob compression {compression!r}, expected '
+                f'one of: {", ".join(_COMPRESSIONS)}')
+        self.content = content
+        self.compression = compression
+        self.compresslevel = compresslevel
+
+
+def _iter_output_chunks(obj: Any) -> Iterator[Any]:
+    if isinstance(obj, (str, bytes, bytearray, memoryview)):
+        yield obj
+    elif isinstance(obj, os.PathLike):
+        with open(obj, 'rb') as f:
+            yield from iter(lambda: f.read(_OUTPUT_CHUNK_SIZE), b'')
+    elif isinstance(obj, io.IOBase):
+        yield from iter(lambda: obj.read(_OUTPUT_CHUNK_SIZE), obj.read(0))
+    elif callable(getattr(obj, 'read', None)):
+        # custom file-like objects may not accept a size
+        yield obj.read()
+    elif isinstance(obj, collections.abc.Iterable):
+        yield from obj
+    else:
+        raise NotImplementedError
+
+
+def _write_output_chunks(target: Any, obj: Any) -> None:
+    for chunk in _iter_output_chunks(obj):
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        elif not isinstance(chunk, (bytes, bytearray, memoryview)):
+            raise NotImplementedError
+        target.write(chunk)
+
 
 class BlobConverter(meta.InConverter,
                     meta.OutConverter,
@@ -68,14 +436,29 @@ class BlobConverter(meta.InConverter,
 
     @classmethod
     def check_output_type_annotation(cls, pytype: type) -> bool:
-        return (
-            issubclass(pytype, (str, bytes, bytearray, azf_abc.InputStream))
+        if meta.is_iterable_type_annotation(
+                pytype, (str, bytes, bytearray, memoryview)):
+            return True
+        return isinstance(pytype, type) and (
+            issubclass(pytype, (str, bytes, bytearray, azf_abc.InputStream,
+                                os.PathLike, CompressedOutput))
             or callable(getattr(pytype, 'read', None))
         )
 
     @classmethod
     def encode(cls, obj: Any, *,
                expected_type: Optional[type]) -> meta.Datum:
+        if isinstance(obj, CompressedOutput):
+            buffer = io.BytesIO()
+            with gzip.GzipFile(fileobj=buffer, mode='wb',
+                               compresslevel=obj.compresslevel) as f:
+                _write_output_chunks(f, obj.content)
+            return meta.Datum(type='bytes', value=buffer.getvalue())
+
+        if isinstance(obj, os.PathLike):
+            with open(obj, 'rb') as f:
+                return meta.Datum(type='bytes', value=f.read())
+
         if callable(getattr(obj, 'read', None)):
             # file-like object
             obj = obj.read()
@@ -83,9 +466,15 @@ class BlobConverter(meta.InConverter,
         if isinstance(obj, str):
             return meta.Datum(type='string', value=obj)
 
-        elif isinstance(obj, (bytes, bytearray)):
+        elif isinstance(obj, (bytes, bytearray, memoryview)):
             return meta.Datum(type='bytes', value=bytes(obj))
 
+        elif isinstance(obj, collections.abc.Iterable):
+            # BytesIO.getvalue() hands over its buffer without a copy
+            buffer = io.BytesIO()
+            _write_output_chunks(buffer, obj)
+            return meta.Datum(type='bytes', value=buffer.getvalue())
+
         else:
             raise NotImplementedError
 
@@ -95,11 +484,15 @@ class BlobConverter(meta.InConverter,
             return None
 
         data_type = data.type
+        threshold = get_spill_threshold()
 
-        if data_type == 'string':
-            data = data.value.encode('utf-8')
+        if data_type == 'string' and threshold is not None \
+                and _utf8_size_exceeds(data.value, threshold):
+            content: Union[bytes, mmap.mmap] = _spill_to_mmap(data.value)
+        elif data_type == 'string':
+            content = data.value.encode('utf-8')
         elif data_type == 'bytes':
-            data = data.value
+            content = data.value
         else:
             raise ValueError(
                 f'unexpected type of data received for the "blob" binding '
@@ -107,7 +500,7 @@ class BlobConverter(meta.InConverter,
             )
 
         if not trigger_metadata:
-            return InputStream(data=data)
+            return InputStream(data=content)
         else:
             properties = cls._decode_trigger_metadata_field(
                 trigger_metadata, 'Properties', python_type=dict)
@@ -131,7 +524,7 @@ class BlobConverter(meta.InConverter,
                 pass
 
             return InputStream(
-                data=data,
+                data=content,
                 name=cls._decode_trigger_metadata_field(
                     trigger_metadata, 'BlobTrigger', python_type=str),
                 length=length,
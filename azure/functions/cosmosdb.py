@@ -2,12 +2,11 @@
 # Licensed under the MIT License.
 
 import collections.abc
-import json
 import typing
 
 from azure.functions import _cosmosdb as cdb
 
-from . import meta
+from . import _json, meta
 
 
 class CosmosDBConverter(meta.InConverter, meta.OutConverter,
@@ -31,22 +30,21 @@ class CosmosDBConverter(meta.InConverter, meta.OutConverter,
 
         data_type = data.type
 
-        if data_type in ['string', 'json']:
+        if data_type in ['string', 'json', 'bytes']:
+            # bytes are decoded as UTF-8 by the JSON decoder without a copy
             body = data.value
 
-        elif data_type == 'bytes':
-            body = data.value.decode('utf-8')
-
         else:
             raise NotImplementedError(
                 f'unsupported queue payload type: {data_type}')
 
-        documents = json.loads(body)
+        documents = _json.loads(body)
         if not isinstance(documents, list):
             documents = [documents]
 
+        # the parsed dicts are not shared, adopt them instead of copying
         return cdb.DocumentList(
-            (None if doc is None else cdb.Document.from_dict(doc))
+            (None if doc is None else cdb.Document.from_dict(doc, copy=False))
             for doc in documents)
 
     @classmethod
@@ -72,7 +70,7 @@ class CosmosDBConverter(meta.InConverter, meta.OutConverter,
 
         return meta.Datum(
             type='json',
-            value=json.dumps([dict(d) for d in data])
+            value=_json.dumps([dict(d) for d in data])
         )
 
 
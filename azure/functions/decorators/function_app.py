@@ -47,6 +47,7 @@ from .function_name import FunctionName
 from .warmup import WarmUpTrigger
 from .._http_asgi import AsgiMiddleware
 from .._http_wsgi import WsgiMiddleware, Context
+from ..warmup import WarmUpContext
 
 
 class Function(object):
@@ -3729,22 +3730,115 @@ class ExternalHttpFunctionApp(
 class AsgiFunctionApp(ExternalHttpFunctionApp):
     def __init__(self, app,
                  http_auth_level: Union[AuthLevel, str] = AuthLevel.FUNCTION,
-                 function_name: str = 'http_app_func'):
+                 function_name: str = 'http_app_func',
+                 startup_on_warmup: bool = False):
         """Constructor of :class:`AsgiFunctionApp` object.
 
         :param app: asgi app object.
         :param http_auth_level: Determines what keys, if any, need to be
         present on the request in order to invoke the function.
         :param function_name: function name
+        :param startup_on_warmup: If true, a warmup triggered function named
+        after function_name is added to notify the asgi app of startup when
+        the instance is warmed up, instead of on the first request. It is
+        not added when the app already has a warmup triggered function.
         """
         super().__init__(auth_level=http_auth_level)
         self.middleware = AsgiMiddleware(app)
         self._add_http_app(self.middleware, function_name)
+        self._function_name = function_name
+        self._startup_on_warmup = startup_on_warmup
         self.startup_task_done = False
+        self._startup_task: Optional[asyncio.Future] = None
+        self._startup_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight_requests = 0
+        self._requests_drained: Optional[asyncio.Event] = None
+        self._shutting_down = False
 
     def __del__(self):
+        if not self.startup_task_done or self._shutting_down:
+            return
+
+        loop = self._startup_loop
+        if loop is not None and loop.is_running():
+            # The lifespan of the asgi app is bound to the loop it was
+            # started on, shut it down there
+            loop.call_soon_threadsafe(asyncio.ensure_future, self.shutdown())
+        else:
+            # Unlike asyncio.run, leaves the current event loop of the
+            # thread untouched
+            shutdown_loop = asyncio.new_event_loop()
+            try:
+                shutdown_loop.run_until_complete(self.shutdown())
+            finally:
+                shutdown_loop.close()
+
+    async def startup(self) -> None:
+        """Notify the asgi app of startup. Concurrent callers wait for the
+        same startup to complete, and the app is only notified once.
+
+        :raises RuntimeError: if the asgi app failed to start up.
+        """
+        if self._startup_task is None:
+            self._startup_loop = asyncio.get_event_loop()
+            self._startup_task = asyncio.ensure_future(
+                self.middleware.notify_startup())
+
+        startup_task = self._startup_task
+        started = False
+        try:
+            started = await asyncio.shield(startup_task)
+        finally:
+            # Let the next request retry a failed startup
+            if (not started and startup_task.done()
+                    and self._startup_task is startup_task):
+                self._startup_task = None
+
+        if not started:
+            raise RuntimeError("ASGI middleware startup failed.")
+        self.startup_task_done = True
+
+    async def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting requests, wait for the in-flight requests to
+        complete and notify the asgi app of shutdown.
+
+        :param timeout: Maximum number of seconds to wait for the in-flight
+        requests, waits for them indefinitely if not set.
+        """
+        self._shutting_down = True
+        if self._inflight_requests > 0:
+            if self._requests_drained is None:
+                self._requests_drained = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._requests_drained.wait(),
+                                       timeout)
+            except asyncio.TimeoutError:
+                logging.warning(
+                    "Shutting down the ASGI app with %d requests still "
+                    "in flight.", self._inflight_requests)
+
         if self.startup_task_done:
-            asyncio.run(self.middleware.notify_shutdown())
+            await self.middleware.notify_shutdown()
+
+    def get_functions(self) -> List[Function]:
+        if self._startup_on_warmup:
+            # Added last, so that a warmup function of the user registered
+            # after the constructor takes precedence
+            self._startup_on_warmup = False
+            if not self._has_warmup_function():
+                self._add_warmup_startup()
+        return super().get_functions()
+
+    def _has_warmup_function(self) -> bool:
+        return any(
+            isinstance(builder._function.get_trigger(), WarmUpTrigger)
+            for builder in self._function_builders)
+
+    def _add_warmup_startup(self) -> None:
+        @self.function_name(name=f'{self._function_name}_warmup')
+        @self.warm_up_trigger('warmupContext')
+        async def warmup(warmupContext: WarmUpContext):
+            await self.startup()
 
     def _add_http_app(self,
                       http_middleware: Union[
@@ -3769,26 +3863,39 @@ class AsgiFunctionApp(ExternalHttpFunctionApp):
                     auth_level=self.auth_level,
                     route="/{*route}")
         async def http_app_func(req: HttpRequest, context: Context):
+            if self._shutting_down:
+                raise RuntimeError("ASGI middleware is shutting down.")
             if not self.startup_task_done:
-                success = await asgi_middleware.notify_startup()
-                if not success:
-                    raise RuntimeError("ASGI middleware startup failed.")
-                self.startup_task_done = True
+                await self.startup()
 
-            return await asgi_middleware.handle_async(req, context)
+            self._inflight_requests += 1
+            try:
+                return await asgi_middleware.handle_async(req, context)
+            finally:
+                self._inflight_requests -= 1
+                if self._inflight_requests == 0 and self._requests_drained:
+                    self._requests_drained.set()
 
 
 class WsgiFunctionApp(ExternalHttpFunctionApp):
     def __init__(self, app,
                  http_auth_level: Union[AuthLevel, str] = AuthLevel.FUNCTION,
-                 function_name: str = 'http_app_func'):
+                 function_name: str = 'http_app_func',
+                 multithread: bool = False,
+                 max_workers: Optional[int] = None):
         """Constructor of :class:`WsgiFunctionApp` object.
 
         :param app: wsgi app object.
         :param function_name: function name
+        :param multithread: whether the wsgi app can be called concurrently
+        from several threads, otherwise requests are served one at a time.
+        :param max_workers: maximum number of threads running the wsgi app
+        concurrently when multithread is True.
         """
         super().__init__(auth_level=http_auth_level)
-        self._add_http_app(WsgiMiddleware(app), function_name)
+        self._add_http_app(WsgiMiddleware(app, multithread=multithread,
+                                          max_workers=max_workers),
+                           function_name)
 
     def _add_http_app(self,
                       http_middleware: Union[
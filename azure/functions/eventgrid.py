@@ -3,12 +3,11 @@
 
 import collections
 import datetime
-import json
 from typing import Optional, List, Any, Dict, Union
 
 from azure.functions import _eventgrid as azf_eventgrid
 
-from . import meta
+from . import _json, meta
 from .meta import Datum
 
 
@@ -31,7 +30,7 @@ class EventGridEventInConverter(meta.InConverter, binding='eventGridTrigger',
         data_type = data.type
 
         if data_type == 'json':
-            body = json.loads(data.value)
+            body = _json.loads(data.value)
         else:
             raise NotImplementedError(
                 f'unsupported event grid payload type: {data_type}')
@@ -70,7 +69,7 @@ class EventGridEventOutConverter(meta.OutConverter, binding="eventGrid"):
         elif isinstance(obj, azf_eventgrid.EventGridOutputEvent):
             return meta.Datum(
                 type='json',
-                value=json.dumps({
+                value=_json.dumps({
                     'id': obj.id,
                     'subject': obj.subject,
                     'dataVersion': obj.data_version,
@@ -101,7 +100,7 @@ class EventGridEventOutConverter(meta.OutConverter, binding="eventGrid"):
 
             return meta.Datum(
                 type='json',
-                value=json.dumps(msgs)
+                value=_json.dumps(msgs)
             )
 
         raise NotImplementedError
@@ -1,12 +1,11 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
-import json
 from typing import Dict, Any, List, Union, Optional, Mapping
 
 from azure.functions import _eventhub
 
-from . import meta
+from . import _json, meta
 
 
 class EventHubConverter(meta.InConverter, meta.OutConverter,
@@ -88,7 +87,7 @@ class EventHubConverter(meta.InConverter, meta.OutConverter,
             data = meta.Datum(type='int', value=obj)
 
         elif isinstance(obj, list):
-            data = meta.Datum(type='json', value=json.dumps(obj))
+            data = meta.Datum(type='json', value=_json.dumps(obj))
 
         return data
 
@@ -147,47 +146,50 @@ class EventHubTriggerConverter(EventHubConverter,
 
         # Input Trigger IotHub Event
         elif data.type == 'json':
-            parsed_data = json.loads(data.value)
+            parsed_data = _json.loads(data.value)
 
         sys_props = trigger_metadata.get('SystemPropertiesArray')
 
         parsed_sys_props: List[Any] = []
         if sys_props is not None:
-            parsed_sys_props = json.loads(sys_props.value)
+            parsed_sys_props = _json.loads(sys_props.value)
 
         if len(parsed_data) != len(parsed_sys_props):
             raise AssertionError('Number of bodies and metadata mismatched')
 
-        events = []
-        for i in range(len(parsed_data)):
-            enqueued_time = parsed_sys_props[i].get('EnqueuedTimeUtc')
-            partition_key = cls.encode(
-                parsed_sys_props[i].get('PartitionKey'),
-                expected_type=str)
-            sequence_number = cls.encode(
-                parsed_sys_props[i].get('SequenceNumber'),
-                expected_type=int)
-            offset = cls.encode(
-                parsed_sys_props[i].get('Offset'),
-                expected_type=int)
-
-            event = _eventhub.EventHubEvent(
-                body=cls._marshall_event_body(parsed_data[i], data.type),
+        # System properties are decoded as is, without wrapping each value
+        # into a Datum
+        return [
+            _eventhub.EventHubEvent(
+                body=cls._marshall_event_body(body, data.type),
                 trigger_metadata=trigger_metadata,
-                enqueued_time=cls._parse_datetime(enqueued_time),
-                partition_key=cls._decode_typed_data(
-                    partition_key, python_type=str),
-                sequence_number=cls._decode_typed_data(
-                    sequence_number, python_type=int),
-                offset=cls._decode_typed_data(
-                    offset, python_type=int),
-                iothub_metadata=cls._extract_iothub_from_dict(
-                    parsed_sys_props[i])
+                enqueued_time=cls._parse_datetime(
+                    props.get('EnqueuedTimeUtc')),
+                partition_key=cls._decode_system_property(
+                    props.get('PartitionKey'), str),
+                sequence_number=cls._decode_system_property(
+                    props.get('SequenceNumber'), int),
+                offset=cls._decode_system_property(
+                    props.get('Offset'), int),
+                iothub_metadata=cls._extract_iothub_from_dict(props)
             )
+            for body, props in zip(parsed_data, parsed_sys_props)
+        ]
 
-            events.append(event)
-
-        return events
+    @classmethod
+    def _decode_system_property(cls, value: Any, python_type: type) -> Any:
+        # Same result as decoding the value with cls.encode() followed by
+        # cls._decode_typed_data(), which only types str, int and list
+        if not isinstance(value, (str, int, list)):
+            return None
+        if isinstance(value, python_type):
+            return value
+        try:
+            return python_type(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(
+                f'cannot convert value of data into '
+                f'{python_type.__name__}: {e}') from None
 
     @classmethod
     def _marshall_event_body(cls, parsed_data, data_type):
@@ -198,7 +200,7 @@ class EventHubTriggerConverter(EventHubConverter,
         # it is handled as single_event by mistake and our users handle the
         # data parsing. And we want to keep the same behavior here.
         if data_type == 'json':
-            return json.dumps(parsed_data).encode('utf-8')
+            return _json.dumps_bytes(parsed_data)
         elif data_type == 'bytes':
             return parsed_data
         elif data_type == 'string':
@@ -238,7 +240,7 @@ class EventHubTriggerConverter(EventHubConverter,
     @classmethod
     def _extract_iothub_from_system_properties(
             cls, system_properties_string: str) -> Dict[str, str]:
-        system_properties = json.loads(system_properties_string)
+        system_properties = _json.loads(system_properties_string)
         return cls._extract_iothub_from_dict(system_properties)
 
     @classmethod
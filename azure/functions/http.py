@@ -1,7 +1,6 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
-import json
 import logging
 import sys
 import typing
@@ -9,7 +8,7 @@ from http.cookies import SimpleCookie
 
 from azure.functions import _abc as azf_abc
 from azure.functions import _http as azf_http
-from . import meta
+from . import _json, meta
 from ._thirdparty.werkzeug.datastructures import Headers
 
 
@@ -31,8 +30,8 @@ class HttpRequest(azf_http.HttpRequest):
         body_str: typing.Optional[str] = None
         body_bytes: typing.Optional[bytes] = None
         if isinstance(body, str):
+            # Encoded lazily in get_body(), get_json() parses it as is
             body_str = body
-            body_bytes = body_str.encode('utf-8')
         elif isinstance(body, bytes):
             body_bytes = body
         else:
@@ -41,7 +40,7 @@ class HttpRequest(azf_http.HttpRequest):
 
         super().__init__(method=method, url=url, headers=headers,
                          params=params, route_params=route_params,
-                         body=body_bytes)
+                         body=body_bytes or b'')
 
         self.__body_type = body_type
         self.__body_str = body_str
@@ -56,10 +55,14 @@ class HttpRequest(azf_http.HttpRequest):
     def get_json(self) -> typing.Any:
         if self.__body_type in ('json', 'string'):
             assert self.__body_str is not None
-            return json.loads(self.__body_str)
-        elif self.__body_bytes is not None:
+            return _json.loads(self.__body_str)
+        elif self.__body_bytes is not None or self.__body_str is not None:
+            body: typing.Union[str, bytes] = (
+                self.__body_bytes if self.__body_bytes is not None
+                else typing.cast(str, self.__body_str))
             try:
-                return json.loads(self.__body_bytes.decode('utf-8'))
+                # JSON codecs decode UTF-8 bytes without an extra copy
+                return _json.loads(body)
             except ValueError as e:
                 raise ValueError(
                     'HTTP request does not contain valid JSON data') from e
@@ -91,6 +94,9 @@ class HttpResponseConverter(meta.OutConverter, binding='http'):
                     ct = f'{obj.mimetype}'
                 headers['content-type'] = ct
 
+            # Streaming responses are buffered here as the host does not
+            # support chunked response bodies yet, see
+            # https://github.com/Azure/azure-functions-host/issues/4926
             body = obj.get_body()
             if body is not None:
                 datum_body = meta.Datum(type='bytes', value=body)
@@ -1,12 +1,13 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
+import base64
+import binascii
 import typing
-import json
 
-from typing import Any, List
+from typing import Any, Dict, List
 
-from . import meta
+from . import _json, meta
 
 from ._kafka import AbstractKafkaEvent
 
@@ -14,6 +15,10 @@ from ._kafka import AbstractKafkaEvent
 class KafkaEvent(AbstractKafkaEvent):
     """A concrete implementation of Kafka event message type."""
 
+    __slots__ = ('__body', '__trigger_metadata', '__key', '__offset',
+                 '__partition', '__topic', '__timestamp', '__headers',
+                 '__header_map', '_trigger_metadata_pyobj')
+
     def __init__(self, *,
                  body: bytes,
                  trigger_metadata: typing.Optional[
@@ -32,6 +37,7 @@ class KafkaEvent(AbstractKafkaEvent):
         self.__topic = topic
         self.__timestamp = timestamp
         self.__headers = headers
+        self.__header_map: typing.Optional[Dict[str, bytes]] = None
 
         # Cache for trigger metadata after Python object conversion
         self._trigger_metadata_pyobj: typing.Optional[
@@ -64,6 +70,16 @@ class KafkaEvent(AbstractKafkaEvent):
     def headers(self) -> typing.Optional[list]:
         return self.__headers
 
+    @property
+    def header_map(self) -> typing.Mapping[str, bytes]:
+        """Header values by header name, decoded on first access.
+
+        When a header is sent more than once, the last value is kept.
+        """
+        if self.__header_map is None:
+            self.__header_map = _decode_headers(self.__headers)
+        return self.__header_map
+
     @property
     def metadata(self) -> typing.Optional[typing.Mapping[str, typing.Any]]:
         if self.__trigger_metadata is None:
@@ -89,6 +105,70 @@ class KafkaEvent(AbstractKafkaEvent):
         )
 
 
+def _decode_headers(headers: typing.Optional[list]) -> Dict[str, bytes]:
+    header_map: Dict[str, bytes] = {}
+    for header in headers or ():
+        # Headers are either objects or json strings of objects
+        if isinstance(header, (str, bytes)):
+            header = _json.loads(header)
+        header_map[header['Key']] = _decode_header_value(header.get('Value'))
+    return header_map
+
+
+def _decode_header_value(value: Any) -> bytes:
+    if value is None:
+        return b''
+    if isinstance(value, bytes):
+        return value
+    # The extension sends the header bytes base64 encoded, values that are
+    # not valid base64 are taken as is
+    try:
+        return base64.b64decode(value, validate=True)
+    except binascii.Error:
+        return str(value).encode('utf-8')
+
+
+class _BatchMetadata:
+    """The trigger metadata of a batch, converted to Python objects once on
+    first access and shared by the events of the batch.
+    """
+
+    __slots__ = ('__trigger_metadata', '__metadata')
+
+    def __init__(self, trigger_metadata: typing.Optional[
+            typing.Mapping[str, meta.Datum]]) -> None:
+        self.__trigger_metadata = trigger_metadata
+        self.__metadata: typing.Optional[Dict[str, Any]] = None
+
+    @property
+    def metadata(self) -> typing.Optional[typing.Mapping[str, typing.Any]]:
+        if self.__trigger_metadata is None:
+            return None
+
+        if self.__metadata is None:
+            self.__metadata = {
+                k: v.value for k, v in self.__trigger_metadata.items()
+            }
+        return self.__metadata
+
+
+class _KafkaBatchEvent(KafkaEvent):
+    """A KafkaEvent of a batch, sharing the trigger metadata converted to
+    Python objects with the other events of the batch.
+    """
+
+    __slots__ = ('__batch_metadata',)
+
+    def __init__(self, *, batch_metadata: _BatchMetadata,
+                 **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.__batch_metadata = batch_metadata
+
+    @property
+    def metadata(self) -> typing.Optional[typing.Mapping[str, typing.Any]]:
+        return self.__batch_metadata.metadata
+
+
 class KafkaConverter(meta.InConverter, meta.OutConverter, binding='kafka'):
     @classmethod
     def check_input_type_annotation(cls, pytype) -> bool:
@@ -240,27 +320,26 @@ class KafkaTriggerConverter(KafkaConverter,
         parsed_partition_props = cls.get_parsed_props(
             partition_props, parsed_data)
 
-        parsed_offset_props: List[Any] = []
+        parsed_offset_props: List[Any] = [None] * len(parsed_data)
         if offset_props is not None:
             parsed_offset_props = [v for v in offset_props.value.sint64]
             if len(parsed_offset_props) != len(parsed_data):
                 raise AssertionError(
                     'Number of bodies and metadata mismatched')
 
-        parsed_topic_props: List[Any]
+        parsed_topic_props: List[Any] = [None] * len(parsed_data)
         if topic_props is not None:
             parsed_topic_props = [v for v in topic_props.value.string]
 
-        parsed_headers_props: List[Any]
+        parsed_headers_props: List[Any] = [None] * len(parsed_data)
         if header_props is not None:
-            parsed_headers_list = cls.get_parsed_props(header_props,
-                                                       parsed_data)
-            parsed_headers_props = [v for v in parsed_headers_list]
-
-        events = []
+            parsed_headers_props = cls.get_parsed_props(header_props,
+                                                        parsed_data)
 
-        for i in range(len(parsed_data)):
-            event = KafkaEvent(
+        batch_metadata = _BatchMetadata(trigger_metadata)
+        return [
+            _KafkaBatchEvent(
+                batch_metadata=batch_metadata,
                 body=parsed_data[i],
                 timestamp=parsed_timestamp_props[i],
                 key=parsed_key_props[i],
@@ -270,9 +349,8 @@ class KafkaTriggerConverter(KafkaConverter,
                 headers=parsed_headers_props[i],
                 trigger_metadata=trigger_metadata
             )
-            events.append(event)
-
-        return events
+            for i in range(len(parsed_data))
+        ]
 
     @classmethod
     def encode(cls, obj: typing.Any, *,
@@ -285,7 +363,7 @@ class KafkaTriggerConverter(KafkaConverter,
             cls, props: meta.Datum, parsed_data) -> List[Any]:
         parsed_props: List[Any] = []
         if props is not None:
-            parsed_props = json.loads(props.value)
+            parsed_props = _json.loads(props.value)
         if len(parsed_data) != len(parsed_props):
             raise AssertionError('Number of bodies and metadata mismatched')
         return parsed_props
@@ -4,22 +4,45 @@
 import abc
 import collections.abc
 import datetime
-import json
+import functools
 import re
-from typing import Dict, Optional, Union, Tuple, Mapping, Any
+from typing import (Callable, Dict, Iterable, List, Optional, Union, Tuple,
+                    Mapping, Any)
 
+from . import _json
 from ._thirdparty import typing_inspect
 from ._utils import (
     try_parse_datetime_with_formats,
     try_parse_timedelta_with_formats
 )
 
+# Fractional seconds with more than the six digits Python supports
+_TOO_FRACTIONAL_RE = re.compile(
+    r'(.*\.\d{6})(\d+)(Z|[\+|-]\d{1,2}:\d{1,2}){0,1}')
+
+# The ISO 8601 shapes used by the host, parsed without strptime, e.g.
+# 2018-08-07T23:17:57.461050Z or 2018-08-07T23:17:57
+_ISO_DATETIME_RE = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2}):([0-9]{2}):([0-9]{2})'
+    r'(?:\.([0-9]{1,6}))?(Z|[+-]00:00)?')
+
+# Number of distinct datetime strings whose parsed value is cached, batches
+# often carry the same enqueued time for many messages
+_DATETIME_CACHE_SIZE = 1024
+
+# Number of (binding, annotation) checks memoised by the converter registry,
+# functions only use a handful of annotations per binding
+_ANNOTATION_CHECKS_SIZE = 1024
+
 
 def is_iterable_type_annotation(annotation: object, pytype: object) -> bool:
+    # Subclasses of generic classes (e.g. class Batch(Sequence[T])) are
+    # generic types without an origin
+    origin = typing_inspect.get_origin(annotation)
     is_iterable_anno = (
         typing_inspect.is_generic_type(annotation)
-        and issubclass(typing_inspect.get_origin(annotation),
-                       collections.abc.Iterable)
+        and isinstance(origin, type)
+        and issubclass(origin, collections.abc.Iterable)
     )
 
     if not is_iterable_anno:
@@ -37,29 +60,70 @@ def is_iterable_type_annotation(annotation: object, pytype: object) -> bool:
                    for arg in args)
 
 
+def _identity(value: Any) -> Any:
+    return value
+
+
+# Datum type -> Python value of a Datum.value, json is decoded by Datum
+_PYTHON_VALUE_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    'bytes': _identity,
+    'string': _identity,
+    'int': _identity,
+    'double': _identity,
+    'collection_string': lambda value: [v for v in value.string],
+    'collection_bytes': lambda value: [v for v in value.bytes],
+    'collection_double': lambda value: [v for v in value.double],
+    'collection_sint64': lambda value: [v for v in value.sint64],
+}
+
+# Datum type -> value decoded by _BaseConverter._decode_typed_data
+_TYPED_DATA_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    'json': lambda value: _json.loads(value),
+    'string': _identity,
+    'int': _identity,
+    'double': _identity,
+    'collection_bytes': _identity,
+    'collection_string': _identity,
+    'collection_sint64': _identity,
+}
+
+
 class Datum:
+
+    __slots__ = ('value', 'type', '_json_value')
+
     def __init__(self, value: Any, type: Optional[str]):
         self.value: Any = value
         self.type: Optional[str] = type
 
+        # (json string, decoded value) memo of python_value
+        self._json_value: Optional[Tuple[Any, Any]] = None
+
     @property
     def python_value(self) -> Any:
+        """The value as a Python object.
+
+        Collections are copied into a new list on each access.  Json
+        objects and arrays are decoded into new objects on each access, so
+        that changing one does not change the value of the datum; other json
+        values are decoded once.
+        """
         if self.value is None or self.type is None:
             return None
-        elif self.type in ('bytes', 'string', 'int', 'double'):
-            return self.value
-        elif self.type == 'json':
-            return json.loads(self.value)
-        elif self.type == 'collection_string':
-            return [v for v in self.value.string]
-        elif self.type == 'collection_bytes':
-            return [v for v in self.value.bytes]
-        elif self.type == 'collection_double':
-            return [v for v in self.value.double]
-        elif self.type == 'collection_sint64':
-            return [v for v in self.value.sint64]
-        else:
+
+        if self.type == 'json':
+            json_value = self._json_value
+            if json_value is not None and json_value[0] is self.value:
+                return json_value[1]
+            decoded = _json.loads(self.value)
+            if not isinstance(decoded, (dict, list)):
+                self._json_value = (self.value, decoded)
+            return decoded
+
+        decoder = _PYTHON_VALUE_DECODERS.get(self.type)
+        if decoder is None:
             return self.value
+        return decoder(self.value)
 
     @property
     def python_type(self) -> type:
@@ -81,6 +145,91 @@ class Datum:
         return '<Datum {} {}>'.format(self.type, val_repr)
 
 
+_UNDECODED = object()
+
+
+class _DatumValueDict(dict):
+    """A dict of the Python values of a mapping of datums.
+
+    Each value is decoded on first access, so that the metadata arrays of a
+    batch that are not read are never copied.  Operations over all the
+    values, e.g. ``items()`` or ``json.dumps()``, decode all of them.
+    """
+
+    __slots__ = ('__datums',)
+
+    def __init__(self, datums: Mapping[str, Datum]) -> None:
+        super().__init__(dict.fromkeys(datums, _UNDECODED))
+        self.__datums = datums
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if value is _UNDECODED:
+            value = self.__datums[key].python_value
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        # Also makes dict(), {**d} and update() go through __getitem__
+        return dict.__iter__(self)
+
+    def _decode_all(self) -> None:
+        for key in dict.keys(self):
+            self[key]
+
+    def items(self):
+        self._decode_all()
+        return dict.items(self)
+
+    def values(self):
+        self._decode_all()
+        return dict.values(self)
+
+    def copy(self) -> dict:
+        self._decode_all()
+        return dict(dict.items(self))
+
+    def pop(self, key, *default):
+        if key in self:
+            self[key]
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self._decode_all()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        return dict.setdefault(self, key, default)
+
+    def __eq__(self, other):
+        self._decode_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        self._decode_all()
+        return dict.__ne__(self, other)
+
+    __hash__ = None
+
+    def __or__(self, other):
+        return self.copy() | other
+
+    def __ror__(self, other):
+        return other | self.copy()
+
+    def __repr__(self) -> str:
+        self._decode_all()
+        return dict.__repr__(self)
+
+    def __reduce__(self):
+        return dict, (self.copy(),)
+
+
 class _ConverterMeta(abc.ABCMeta):
 
     _bindings: Dict[str, type] = {}
@@ -102,13 +251,87 @@ class _ConverterMeta(abc.ABCMeta):
         mcls._bindings[binding] = cls
         if trigger is not None:
             mcls._bindings[trigger] = cls
+        # Checks made before the converter was registered are stale
+        mcls._annotation_checks.clear()
 
         return cls
 
+    # (binding name, is output, annotation) -> annotation is supported,
+    # for the bindings with a registered converter only
+    _annotation_checks: Dict[Tuple[str, bool, Any], bool] = {}
+
     @classmethod
     def get(cls, binding_name):
         return cls._bindings.get(binding_name)
 
+    @classmethod
+    def check_input_annotation(cls, binding_name: str,
+                               pytype: Any) -> bool:
+        """Check if a parameter annotation is supported as an input of a
+        binding.  The result is memoised per (binding, annotation).
+
+        :return: False when no input converter is registered for the
+        binding.
+        """
+        return cls._check_annotation(binding_name, pytype, False)
+
+    @classmethod
+    def check_output_annotation(cls, binding_name: str,
+                                pytype: Any) -> bool:
+        """Check if a parameter annotation is supported as an output of a
+        binding.  The result is memoised per (binding, annotation).
+
+        :return: False when no output converter is registered for the
+        binding.
+        """
+        return cls._check_annotation(binding_name, pytype, True)
+
+    @classmethod
+    def precompile(cls, annotations: Iterable[Tuple[str, Any, bool]]) \
+            -> List[bool]:
+        """Resolve the annotation checks of the parameters of functions
+        ahead of time, e.g. when the functions are loaded.
+
+        :param annotations: (binding name, annotation, is output) of each
+        parameter.
+        :return: Whether each annotation is supported, in the same order.
+        """
+        return [cls._check_annotation(binding_name, pytype, is_output)
+                for binding_name, pytype, is_output in annotations]
+
+    @classmethod
+    def _check_annotation(cls, binding_name: str, pytype: Any,
+                          is_output: bool) -> bool:
+        converter = cls._bindings.get(binding_name)
+        if converter is None:
+            return False
+
+        key = (binding_name, is_output, pytype)
+        try:
+            return cls._annotation_checks[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable annotations are checked every time
+            return cls._check_converter_annotation(
+                converter, pytype, is_output)
+
+        supported = cls._check_converter_annotation(
+            converter, pytype, is_output)
+        if len(cls._annotation_checks) < _ANNOTATION_CHECKS_SIZE:
+            cls._annotation_checks[key] = supported
+        return supported
+
+    @classmethod
+    def _check_converter_annotation(cls, converter: type, pytype: Any,
+                                    is_output: bool) -> bool:
+        check = getattr(converter,
+                        'check_output_type_annotation' if is_output
+                        else 'check_input_type_annotation', None)
+        if check is None:
+            return False
+        return bool(check(pytype))
+
     def has_trigger_support(cls) -> bool:
         return cls._trigger is not None  # type: ignore
 
@@ -124,33 +347,14 @@ class _BaseConverter(metaclass=_ConverterMeta, binding=None):
             return None
 
         data_type = data.type
-        if data_type == 'json':
-            result = json.loads(data.value)
-
-        elif data_type == 'string':
-            result = data.value
-
-        elif data_type == 'int':
-            result = data.value
-
-        elif data_type == 'double':
-            result = data.value
-
-        elif data_type == 'collection_bytes':
-            result = data.value
-
-        elif data_type == 'collection_string':
-            result = data.value
-
-        elif data_type == 'collection_sint64':
-            result = data.value
-
-        elif data_type is None:
+        if data_type is None:
             return None
 
-        else:
+        decoder = _TYPED_DATA_DECODERS.get(data_type)
+        if decoder is None:
             raise ValueError(
                 f'unsupported type of {context}: {data_type}')
+        result = decoder(data.value)
 
         if not isinstance(result, python_type):
             if isinstance(python_type, (tuple, list, dict)):
@@ -216,8 +420,14 @@ class _BaseConverter(metaclass=_ConverterMeta, binding=None):
         if not datetime_str:
             return None
 
-        too_fractional = re.match(
-            r'(.*\.\d{6})(\d+)(Z|[\+|-]\d{1,2}:\d{1,2}){0,1}', datetime_str)
+        return cls._parse_datetime_cached(datetime_str)
+
+    @classmethod
+    @functools.lru_cache(maxsize=_DATETIME_CACHE_SIZE)
+    def _parse_datetime_cached(
+            cls, datetime_str: str) -> Optional[datetime.datetime]:
+        # datetime objects are immutable, so parsed values can be shared
+        too_fractional = _TOO_FRACTIONAL_RE.match(datetime_str)
 
         if too_fractional:
             # The supplied value contains seven digits in the
@@ -227,6 +437,10 @@ class _BaseConverter(metaclass=_ConverterMeta, binding=None):
             datetime_str = too_fractional.group(1) + (
                 too_fractional.group(3) or '')
 
+        parsed = cls._parse_datetime_iso(datetime_str)
+        if parsed is not None:
+            return parsed
+
         # Try parse time
         utc_time, utc_time_error = cls._parse_datetime_utc(datetime_str)
         if not utc_time_error and utc_time:
@@ -244,6 +458,29 @@ class _BaseConverter(metaclass=_ConverterMeta, binding=None):
         else:
             return None
 
+    @classmethod
+    def _parse_datetime_iso(
+            cls, datetime_str: str) -> Optional[datetime.datetime]:
+        """Parse the ISO 8601 shapes also accepted by the first UTC and
+        local formats, returns None for any other string so that it goes
+        through the strptime formats.
+        """
+        match = _ISO_DATETIME_RE.fullmatch(datetime_str)
+        if match is None:
+            return None
+
+        (year, month, day, hour, minute, second,
+         fraction, tz) = match.groups()
+        try:
+            return datetime.datetime(
+                int(year), int(month), int(day),
+                int(hour), int(minute), int(second),
+                int(fraction.ljust(6, '0')) if fraction else 0,
+                tzinfo=datetime.timezone.utc if tz else None)
+        except ValueError:
+            # Out of range values, let strptime report the error
+            return None
+
     @classmethod
     def _parse_timedelta(
         cls,
@@ -288,12 +525,8 @@ class _BaseConverter(metaclass=_ConverterMeta, binding=None):
             '%m/%d/%Y %H:%M:%S.%f-00:00',
         ]
 
-        dt, _, excpt = try_parse_datetime_with_formats(
-            datetime_str, utc_formats)
-
-        if excpt is not None:
-            return None, excpt
-        return dt, None
+        return cls._try_parse_datetime_memoized(
+            datetime_str, utc_formats, 'utc')
 
     @classmethod
     def _parse_datetime_local(
@@ -327,11 +560,34 @@ class _BaseConverter(metaclass=_ConverterMeta, binding=None):
             '%m/%d/%YT%H:%M:%S'
         ]
 
-        dt, _, excpt = try_parse_datetime_with_formats(
-            datetime_str, local_formats)
+        return cls._try_parse_datetime_memoized(
+            datetime_str, local_formats, 'local')
+
+    # Last format that parsed a datetime, for each list of formats
+    _last_datetime_formats: Dict[str, str] = {}
+
+    @classmethod
+    def _try_parse_datetime_memoized(
+        cls, datetime_str: str, datetime_formats: List[str], kind: str
+    ) -> Tuple[Optional[datetime.datetime], Optional[Exception]]:
+        # The formats are mutually exclusive, trying the last successful one
+        # first does not change the result, and a miss falls back to trying
+        # them all in order so that the same error is reported
+        last_format = _BaseConverter._last_datetime_formats.get(kind)
+        if last_format is not None:
+            try:
+                return (datetime.datetime.strptime(datetime_str, last_format),
+                        None)
+            except ValueError:
+                pass
+
+        dt, fmt, excpt = try_parse_datetime_with_formats(
+            datetime_str, datetime_formats)
 
         if excpt is not None:
             return None, excpt
+        if fmt is not None:
+            _BaseConverter._last_datetime_formats[kind] = fmt
         return dt, None
 
     @classmethod
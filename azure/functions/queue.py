@@ -3,18 +3,20 @@
 
 import collections.abc
 import datetime
-import json
 from typing import List, Dict, Any, Union, Optional
 
 from azure.functions import _abc as azf_abc
 from azure.functions import _queue as azf_queue
 
-from . import meta
+from . import _json, meta
 
 
 class QueueMessage(azf_queue.QueueMessage):
     """An HTTP response object."""
 
+    __slots__ = ('__dequeue_count', '__expiration_time', '__insertion_time',
+                 '__time_next_visible')
+
     def __init__(self, *,
                  id=None, body=None,
                  dequeue_count=None,
@@ -116,7 +118,7 @@ class QueueMessageOutConverter(meta.OutConverter, binding='queue'):
         elif isinstance(obj, azf_queue.QueueMessage):
             return meta.Datum(
                 type='json',
-                value=json.dumps({
+                value=_json.dumps({
                     'id': obj.id,
                     'body': obj.get_body().decode('utf-8'),
                 })
@@ -139,7 +141,7 @@ class QueueMessageOutConverter(meta.OutConverter, binding='queue'):
 
             return meta.Datum(
                 type='json',
-                value=json.dumps(msgs)
+                value=_json.dumps(msgs)
             )
 
         raise NotImplementedError
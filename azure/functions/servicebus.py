@@ -2,17 +2,30 @@
 # Licensed under the MIT License.
 
 import datetime
-import json
-from typing import Dict, Any, List, Union, Optional, Mapping, cast
+from typing import Dict, Any, List, Union, Optional, Mapping, Tuple, cast
 
 from azure.functions import _servicebus as azf_sbus
 
-from . import meta
+from . import _json, meta
 
 
 class ServiceBusMessage(azf_sbus.ServiceBusMessage):
     """An HTTP response object."""
 
+    __slots__ = (
+        '__body', '__trigger_metadata', '__application_properties',
+        '__content_type', '__correlation_id',
+        '__dead_letter_error_description', '__dead_letter_reason',
+        '__dead_letter_source', '__delivery_count',
+        '__enqueued_sequence_number', '__enqueued_time_utc',
+        '__expires_at_utc', '__label', '__locked_until', '__lock_token',
+        '__message_id', '__partition_key', '__reply_to',
+        '__reply_to_session_id', '__scheduled_enqueue_time_utc',
+        '__sequence_number', '__session_id', '__state', '__subject',
+        '__time_to_live', '__to', '__transaction_partition_key',
+        '__user_properties', '_trigger_metadata_pyobj',
+    )
+
     def __init__(
             self, *,
             body: bytes,
@@ -206,11 +219,10 @@ class ServiceBusMessage(azf_sbus.ServiceBusMessage):
             return None
 
         if self._trigger_metadata_pyobj is None:
-            # No need to do deepcopy since datum.python_value will construct
-            # new object
-            self._trigger_metadata_pyobj = {
-                k: v.python_value for (k, v) in self.__trigger_metadata.items()
-            }
+            # Values are decoded on first access, json values are decoded
+            # once per datum and shared with the other messages of a batch
+            self._trigger_metadata_pyobj = meta._DatumValueDict(
+                self.__trigger_metadata)
         return self._trigger_metadata_pyobj
 
     def __repr__(self) -> str:
@@ -221,9 +233,123 @@ class ServiceBusMessage(azf_sbus.ServiceBusMessage):
         )
 
 
+def _lazy_message_property(name: str) -> property:
+    def fget(self: '_LazyServiceBusMessage') -> Any:
+        return self._get_field(name)
+
+    fget.__name__ = name
+    return property(fget)
+
+
+class _LazyServiceBusMessage(ServiceBusMessage):
+    """A ServiceBusMessage decoding each of its properties from the trigger
+    metadata on first access, so that handlers only reading the body do not
+    pay for decoding the rest of the message.
+    """
+
+    __slots__ = ('__raw_metadata', '__decoded_fields')
+
+    def __init__(self, *, body: bytes,
+                 trigger_metadata: Mapping[str, meta.Datum]) -> None:
+        super().__init__(body=body, trigger_metadata=trigger_metadata,
+                         application_properties={}, message_id='',
+                         user_properties={})
+        self.__raw_metadata = trigger_metadata
+        self.__decoded_fields: Dict[str, Any] = {}
+
+    def _get_field(self, name: str) -> Any:
+        try:
+            return self.__decoded_fields[name]
+        except KeyError:
+            value = ServiceBusMessageInConverter._decode_message_field(
+                self.__raw_metadata, name)
+            self.__decoded_fields[name] = value
+            return value
+
+    application_properties = _lazy_message_property('application_properties')
+    content_type = _lazy_message_property('content_type')
+    correlation_id = _lazy_message_property('correlation_id')
+    dead_letter_error_description = _lazy_message_property(
+        'dead_letter_error_description')
+    dead_letter_reason = _lazy_message_property('dead_letter_reason')
+    dead_letter_source = _lazy_message_property('dead_letter_source')
+    delivery_count = _lazy_message_property('delivery_count')
+    enqueued_sequence_number = _lazy_message_property(
+        'enqueued_sequence_number')
+    enqueued_time_utc = _lazy_message_property('enqueued_time_utc')
+    expires_at_utc = _lazy_message_property('expires_at_utc')
+    expiration_time = _lazy_message_property('expires_at_utc')
+    label = _lazy_message_property('label')
+    locked_until = _lazy_message_property('locked_until')
+    lock_token = _lazy_message_property('lock_token')
+    message_id = _lazy_message_property('message_id')
+    partition_key = _lazy_message_property('partition_key')
+    reply_to = _lazy_message_property('reply_to')
+    reply_to_session_id = _lazy_message_property('reply_to_session_id')
+    scheduled_enqueue_time = _lazy_message_property(
+        'scheduled_enqueue_time_utc')
+    scheduled_enqueue_time_utc = _lazy_message_property(
+        'scheduled_enqueue_time_utc')
+    sequence_number = _lazy_message_property('sequence_number')
+    session_id = _lazy_message_property('session_id')
+    state = _lazy_message_property('state')
+    subject = _lazy_message_property('subject')
+    time_to_live = _lazy_message_property('time_to_live')
+    to = _lazy_message_property('to')
+    transaction_partition_key = _lazy_message_property(
+        'transaction_partition_key')
+    user_properties = _lazy_message_property('user_properties')
+
+
 class ServiceBusMessageInConverter(meta.InConverter,
                                    binding='serviceBusTrigger', trigger=True):
 
+    # Message property name -> (trigger metadata field, python type)
+    _MESSAGE_FIELDS: Dict[str, Tuple[str, type]] = {
+        'application_properties': ('ApplicationProperties', dict),
+        'content_type': ('ContentType', str),
+        'correlation_id': ('CorrelationId', str),
+        'dead_letter_error_description': ('DeadLetterErrorDescription', str),
+        'dead_letter_reason': ('DeadLetterReason', str),
+        'dead_letter_source': ('DeadLetterSource', str),
+        'delivery_count': ('DeliveryCount', int),
+        'enqueued_sequence_number': ('EnqueuedSequenceNumber', int),
+        'enqueued_time_utc': ('EnqueuedTimeUtc', datetime.datetime),
+        'expires_at_utc': ('ExpiresAtUtc', datetime.datetime),
+        'label': ('Label', str),
+        'locked_until': ('LockedUntil', datetime.datetime),
+        'lock_token': ('LockToken', str),
+        'message_id': ('MessageId', str),
+        'partition_key': ('PartitionKey', str),
+        'reply_to': ('ReplyTo', str),
+        'reply_to_session_id': ('ReplyToSessionId', str),
+        'scheduled_enqueue_time_utc': ('ScheduledEnqueueTimeUtc',
+                                       datetime.datetime),
+        'sequence_number': ('SequenceNumber', int),
+        'session_id': ('SessionId', str),
+        'state': ('State', int),
+        'subject': ('Subject', str),
+        'time_to_live': ('TimeToLive', datetime.timedelta),
+        'to': ('To', str),
+        'transaction_partition_key': ('TransactionPartitionKey', str),
+        'user_properties': ('UserProperties', dict),
+    }
+
+    # Metadata arrays read when decoding a batch of messages
+    _METADATA_ARRAYS = (
+        'ApplicationPropertiesArray', 'ContentTypeArray',
+        'CorrelationIdArray', 'DeadLetterErrorDescriptionArray',
+        'DeadLetterReasonArray', 'DeadLetterSourceArray',
+        'DeliveryCountArray', 'EnqueuedSequenceNumberArray',
+        'EnqueuedTimeUtcArray', 'ExpiresAtUtcArray', 'LabelArray',
+        'LockedUntilArray', 'LockTokenArray', 'MessageIdArray',
+        'PartitionKeyArray', 'ReplyToSessionIdArray',
+        'ScheduledEnqueueTimeUtcArray', 'SequenceNumberArray',
+        'SessionIdArray', 'StateArray', 'SubjectArray', 'TimeToLiveArray',
+        'ToArray', 'TransactionPartitionKeyArray', 'ReplyToArray',
+        'UserPropertiesArray',
+    )
+
     @classmethod
     def check_input_type_annotation(cls, pytype: type) -> bool:
         valid_types = (azf_sbus.ServiceBusMessage)
@@ -289,63 +415,24 @@ class ServiceBusMessageInConverter(meta.InConverter,
             raise NotImplementedError(
                 'missing trigger metadata for ServiceBus message input')
 
-        return ServiceBusMessage(
-            body=body,
-            trigger_metadata=trigger_metadata,
-            application_properties=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'ApplicationProperties', python_type=dict),
-            content_type=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'ContentType', python_type=str),
-            correlation_id=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'CorrelationId', python_type=str),
-            dead_letter_error_description=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'DeadLetterErrorDescription',
-                python_type=str),
-            dead_letter_reason=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'DeadLetterReason', python_type=str),
-            dead_letter_source=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'DeadLetterSource', python_type=str),
-            delivery_count=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'DeliveryCount', python_type=int),
-            enqueued_sequence_number=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'EnqueuedSequenceNumber', python_type=int),
-            enqueued_time_utc=cls._parse_datetime_metadata(
-                trigger_metadata, 'EnqueuedTimeUtc'),
-            expires_at_utc=cls._parse_datetime_metadata(
-                trigger_metadata, 'ExpiresAtUtc'),
-            label=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'Label', python_type=str),
-            locked_until=cls._parse_datetime_metadata(
-                trigger_metadata, 'LockedUntil'),
-            lock_token=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'LockToken', python_type=str),
-            message_id=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'MessageId', python_type=str),
-            partition_key=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'PartitionKey', python_type=str),
-            reply_to=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'ReplyTo', python_type=str),
-            reply_to_session_id=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'ReplyToSessionId', python_type=str),
-            scheduled_enqueue_time_utc=cls._parse_datetime_metadata(
-                trigger_metadata, 'ScheduledEnqueueTimeUtc'),
-            sequence_number=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'SequenceNumber', python_type=int),
-            session_id=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'SessionId', python_type=str),
-            state=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'State', python_type=int),
-            subject=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'Subject', python_type=str),
-            time_to_live=cls._parse_timedelta_metadata(
-                trigger_metadata, 'TimeToLive'),
-            to=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'To', python_type=str),
-            transaction_partition_key=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'TransactionPartitionKey', python_type=str),
-            user_properties=cls._decode_trigger_metadata_field(
-                trigger_metadata, 'UserProperties', python_type=dict),
-        )
+        # Message properties are decoded from the trigger metadata on
+        # first access
+        return _LazyServiceBusMessage(body=body,
+                                      trigger_metadata=trigger_metadata)
+
+    @classmethod
+    def _decode_message_field(
+        cls,
+        trigger_metadata: Mapping[str, meta.Datum],
+        name: str
+    ) -> Any:
+        field, python_type = cls._MESSAGE_FIELDS[name]
+        if python_type is datetime.datetime:
+            return cls._parse_datetime_metadata(trigger_metadata, field)
+        elif python_type is datetime.timedelta:
+            return cls._parse_timedelta_metadata(trigger_metadata, field)
+        return cls._decode_trigger_metadata_field(
+            trigger_metadata, field, python_type=python_type)
 
     @classmethod
     def decode_multiple_messages(
@@ -364,7 +451,7 @@ class ServiceBusMessageInConverter(meta.InConverter,
 
         # Input Trigger IotHub Event
         elif data.type == 'json':
-            parsed_data = json.loads(data.value)
+            parsed_data = _json.loads(data.value)
 
         else:
             raise NotImplementedError('unable to decode multiple messages '
@@ -386,15 +473,6 @@ class ServiceBusMessageInConverter(meta.InConverter,
     ) -> bool:
         return 'UserProperties' in trigger_metadata
 
-    @classmethod
-    def _get_event_count(
-        cls,
-        trigger_metadata: Mapping[str, meta.Datum]
-    ) -> int:
-        datum = trigger_metadata['UserPropertiesArray']
-        user_props = json.loads(datum.value)
-        return len(user_props)
-
     @classmethod
     def _marshall_message_body(
         cls,
@@ -406,7 +484,7 @@ class ServiceBusMessageInConverter(meta.InConverter,
         elif data_type == 'str' and isinstance(body, str):
             return body.encode('utf-8')
         elif data_type == 'json' and isinstance(body, dict):
-            return json.dumps(body).encode('utf-8')
+            return _json.dumps_bytes(body)
         else:
             raise NotImplementedError('unable to marshall message body with '
                                       f'data_type {data_type}')
@@ -427,7 +505,7 @@ class ServiceBusMessageInConverter(meta.InConverter,
             return cast(List[bytes], [b.encode('utf-8') for b in strings])
         elif data_type == 'json':
             return cast(List[bytes],
-                        [json.dumps(b).encode('utf-8') for b in bodies])
+                        [_json.dumps_bytes(b) for b in bodies])
         else:
             raise NotImplementedError('unable to marshall message bodies with '
                                       f'data_type {data_type}')
@@ -437,126 +515,92 @@ class ServiceBusMessageInConverter(meta.InConverter,
         cls, parsed_data: Union[List[bytes], List[str]], data_type: str,
         trigger_metadata: Mapping[str, meta.Datum]
     ) -> List[ServiceBusMessage]:
-        messages: List[ServiceBusMessage] = []
-        num_messages: int = cls._get_event_count(trigger_metadata)
+        # Each metadata array is decoded once into a column, padded with
+        # None up to the number of messages, which are then built by index
+        columns: Dict[str, List[Any]] = {}
+        for array_name in cls._METADATA_ARRAYS:
+            data_array = cls._get_metadata_array(trigger_metadata, array_name)
+            columns[array_name] = data_array if data_array is not None else []
+
+        num_messages: int = len(columns['UserPropertiesArray'])
+        for data_array in columns.values():
+            if len(data_array) < num_messages:
+                data_array += [None] * (num_messages - len(data_array))
+
         message_bodies: List[bytes] = cls._marshall_message_bodies(
             bodies=parsed_data, data_type=data_type
         )
+        messages: List[ServiceBusMessage] = []
         for i in range(num_messages):
             messages.append(ServiceBusMessage(
                 body=message_bodies[i],
                 trigger_metadata=trigger_metadata,
-                application_properties=cls._get_from_metadata_array(
-                    trigger_metadata, 'ApplicationPropertiesArray', i),
-                content_type=cls._get_from_metadata_array(
-                    trigger_metadata, 'ContentTypeArray', i),
-                correlation_id=cls._get_from_metadata_array(
-                    trigger_metadata, 'CorrelationIdArray', i),
-                dead_letter_error_description=cls._get_from_metadata_array(
-                    trigger_metadata, 'DeadLetterErrorDescriptionArray', i),
-                dead_letter_reason=cls._get_from_metadata_array(
-                    trigger_metadata, 'DeadLetterReasonArray', i),
-                dead_letter_source=cls._get_from_metadata_array(
-                    trigger_metadata, 'DeadLetterSourceArray', i),
-                delivery_count=cls._get_from_metadata_array(
-                    trigger_metadata, 'DeliveryCountArray', i),
-                enqueued_sequence_number=cls._get_from_metadata_array(
-                    trigger_metadata, 'EnqueuedSequenceNumberArray', i),
+                application_properties=columns[
+                    'ApplicationPropertiesArray'][i],
+                content_type=columns['ContentTypeArray'][i],
+                correlation_id=columns['CorrelationIdArray'][i],
+                dead_letter_error_description=columns[
+                    'DeadLetterErrorDescriptionArray'][i],
+                dead_letter_reason=columns['DeadLetterReasonArray'][i],
+                dead_letter_source=columns['DeadLetterSourceArray'][i],
+                delivery_count=columns['DeliveryCountArray'][i],
+                enqueued_sequence_number=columns[
+                    'EnqueuedSequenceNumberArray'][i],
                 enqueued_time_utc=cls._parse_datetime(
-                    cls._get_from_metadata_array(
-                        trigger_metadata, 'EnqueuedTimeUtcArray', i)),
+                    columns['EnqueuedTimeUtcArray'][i]),
                 expires_at_utc=cls._parse_datetime(
-                    cls._get_from_metadata_array(
-                        trigger_metadata, 'ExpiresAtUtcArray', i)),
-                label=cls._get_from_metadata_array(
-                    trigger_metadata, 'LabelArray', i),
-                locked_until=cls._parse_datetime(cls._get_from_metadata_array(
-                    trigger_metadata, 'LockedUntilArray', i)),
-                lock_token=cls._get_from_metadata_array(
-                    trigger_metadata, 'LockTokenArray', i),
-                message_id=cls._get_from_metadata_array(
-                    trigger_metadata, 'MessageIdArray', i),
-                partition_key=cls._get_from_metadata_array(
-                    trigger_metadata, 'PartitionKeyArray', i),
-                reply_to_session_id=cls._get_from_metadata_array(
-                    trigger_metadata, 'ReplyToSessionIdArray', i),
+                    columns['ExpiresAtUtcArray'][i]),
+                label=columns['LabelArray'][i],
+                locked_until=cls._parse_datetime(
+                    columns['LockedUntilArray'][i]),
+                lock_token=columns['LockTokenArray'][i],
+                message_id=columns['MessageIdArray'][i],
+                partition_key=columns['PartitionKeyArray'][i],
+                reply_to_session_id=columns['ReplyToSessionIdArray'][i],
                 scheduled_enqueue_time_utc=cls._parse_datetime(
-                    cls._get_from_metadata_array(
-                        trigger_metadata, 'ScheduledEnqueueTimeUtcArray', i)),
-                sequence_number=cls._get_from_metadata_array(
-                    trigger_metadata, 'SequenceNumberArray', i),
-                session_id=cls._get_from_metadata_array(
-                    trigger_metadata, 'SessionIdArray', i),
-                state=cls._get_from_metadata_array(
-                    trigger_metadata, 'StateArray', i),
-                subject=cls._get_from_metadata_array(
-                    trigger_metadata, 'SubjectArray', i),
+                    columns['ScheduledEnqueueTimeUtcArray'][i]),
+                sequence_number=columns['SequenceNumberArray'][i],
+                session_id=columns['SessionIdArray'][i],
+                state=columns['StateArray'][i],
+                subject=columns['SubjectArray'][i],
                 time_to_live=cls._parse_timedelta(
-                    cls._get_from_metadata_array(
-                        trigger_metadata, 'TimeToLiveArray', i)),
-                to=cls._get_from_metadata_array(
-                    trigger_metadata, 'ToArray', i),
-                transaction_partition_key=cls._get_from_metadata_array(
-                    trigger_metadata, 'TransactionPartitionKeyArray', i),
-                reply_to=cls._get_from_metadata_array(
-                    trigger_metadata, 'ReplyToArray', i),
-                user_properties=cls._get_from_metadata_array(
-                    trigger_metadata, 'UserPropertiesArray', i)
+                    columns['TimeToLiveArray'][i]),
+                to=columns['ToArray'][i],
+                transaction_partition_key=columns[
+                    'TransactionPartitionKeyArray'][i],
+                reply_to=columns['ReplyToArray'][i],
+                user_properties=columns['UserPropertiesArray'][i]
             ))
         return messages
 
     @classmethod
-    def _get_from_metadata_array(
+    def _get_metadata_array(
         cls,
         trigger_metadata: Mapping[str, meta.Datum],
-        array_name: str,
-        index: int
-    ) -> Any:
-        """This method is to safe-guard when retrieve data from arrays.
-
-        Some array may be missing in metadata. Others may not contain certain
-        values (e.g. correlation_ids array may be empty [] when there's
-        multiple messages).
-
-        Parameters
-        ----------
-        trigger_metadata: Mapping[str, meta.Datum]
-            The trigger metadata that contains multiple ServiceBus messages
         array_name: str
-            The name of the array needs to be extracted
-        index: int
-            The element index wants to be extracted
+    ) -> Optional[List[Any]]:
+        """Decode a metadata array (e.g. ContentTypeArray) as a list.
 
-        Returns
-        -------
-        Optional[Any]
-            If the array name does not exist in trigger_metadata, returns None.
-            If the array does not contains certain element, or index out of
-            bound, returns None.
-            Otherwise, return the element.
+        Returns None if the array does not exist in trigger_metadata or has
+        an unsupported datum type.
         """
-
-        # Check if array name does exist (e.g. ContentTypeArray)
         datum: Optional[meta.Datum] = trigger_metadata.get(array_name)
         if datum is None:
             return None
 
-        # Check if datum is an iterable element (e.g. collection_string)
-        data_array: Optional[Union[List[str], List[int], List[bytes]]] = None
+        # Copied into a new list, so padding it does not alter the datum
         if datum.type == 'collection_string':
-            data_array = datum.value.string
+            return list(datum.value.string)
         elif datum.type == 'collection_bytes':
-            data_array = datum.value.bytes
+            return list(datum.value.bytes)
         elif datum.type == 'collection_sint64':
-            data_array = datum.value.sint64
+            return list(datum.value.sint64)
         elif datum.type == 'json':
-            data_array = json.loads(datum.value)
-
-        # Check if the index is inbound
-        if data_array is None or index >= len(data_array):
-            return None
+            data_array = _json.loads(datum.value)
+            if isinstance(data_array, list):
+                return data_array
 
-        return data_array[index]
+        return None
 
 
 class ServiceBusMessageOutConverter(meta.OutConverter, binding='serviceBus'):
@@ -2,12 +2,11 @@
 # Licensed under the MIT License.
 
 import collections.abc
-import json
 import typing
 
 from azure.functions import _sql as sql
 
-from . import meta
+from . import _json, meta
 
 
 class SqlConverter(meta.InConverter, meta.OutConverter,
@@ -31,22 +30,21 @@ class SqlConverter(meta.InConverter, meta.OutConverter,
 
         data_type = data.type
 
-        if data_type in ['string', 'json']:
+        if data_type in ['string', 'json', 'bytes']:
+            # bytes are decoded as UTF-8 by the JSON decoder without a copy
             body = data.value
 
-        elif data_type == 'bytes':
-            body = data.value.decode('utf-8')
-
         else:
             raise NotImplementedError(
                 f'Unsupported payload type: {data_type}')
 
-        rows = json.loads(body)
+        rows = _json.loads(body)
         if not isinstance(rows, list):
             rows = [rows]
 
+        # the parsed dicts are not shared, adopt them instead of copying
         return sql.SqlRowList(
-            (None if row is None else sql.SqlRow.from_dict(row))
+            (None if row is None else sql.SqlRow.from_dict(row, copy=False))
             for row in rows)
 
     @classmethod
@@ -74,5 +72,5 @@ class SqlConverter(meta.InConverter, meta.OutConverter,
 
         return meta.Datum(
             type='json',
-            value=json.dumps([dict(d) for d in data])
+            value=_json.dumps([dict(d) for d in data])
         )
@@ -1,11 +1,10 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
-import json
 import typing
 
 from azure.functions import _abc as azf_abc
-from . import meta
+from . import _json, meta
 
 
 class TimerRequest(azf_abc.TimerRequest):
@@ -42,7 +41,7 @@ class TimerRequestConverter(meta.InConverter,
         if data.type != 'json':
             raise NotImplementedError
 
-        info = json.loads(data.value)
+        info = _json.loads(data.value)
 
         return TimerRequest(
             past_due=info.get('IsPastDue', False),
@@ -1,6 +1,7 @@
 #  Copyright (c) Microsoft Corporation. All rights reserved.
 #  Licensed under the MIT License.
 from abc import ABC
+import asyncio
 import inspect
 import json
 import unittest
@@ -9,7 +10,7 @@ from unittest.mock import patch
 
 from azure.functions import WsgiMiddleware, AsgiMiddleware
 from azure.functions.decorators.constants import HTTP_OUTPUT, HTTP_TRIGGER, \
-    TIMER_TRIGGER
+    TIMER_TRIGGER, WARMUP_TRIGGER
 from azure.functions.decorators.core import DataType, AuthLevel, \
     BindingDirection, SCRIPT_FILE_NAME
 from azure.functions.decorators.function_app import (
@@ -924,6 +925,120 @@ class TestFunctionApp(unittest.TestCase):
         self.assertEqual(len(funcs), 1)
         self.assertTrue(funcs[0].is_http_function())
 
+    def test_asgi_function_app_single_startup(self):
+        app = AsgiFunctionApp(app=object())
+        started = []
+
+        async def notify_startup():
+            started.append(True)
+            await asyncio.sleep(0.01)
+            return True
+
+        app.middleware.notify_startup = notify_startup
+        app.middleware.notify_shutdown = mock.AsyncMock()
+        app.middleware.handle_async = mock.AsyncMock(return_value='resp')
+        http_func = app.get_functions()[0].get_user_function()
+
+        async def run():
+            return await asyncio.gather(
+                *(http_func(mock.Mock(), mock.Mock()) for _ in range(5)))
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        self.assertEqual(loop.run_until_complete(run()), ['resp'] * 5)
+        self.assertEqual(len(started), 1)
+        self.assertTrue(app.startup_task_done)
+
+    def test_asgi_function_app_startup_failed(self):
+        app = AsgiFunctionApp(app=object())
+        app.middleware.notify_startup = mock.AsyncMock(return_value=False)
+        http_func = app.get_functions()[0].get_user_function()
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        with self.assertRaises(RuntimeError):
+            loop.run_until_complete(http_func(mock.Mock(), mock.Mock()))
+        self.assertFalse(app.startup_task_done)
+
+    def test_asgi_function_app_startup_retried_after_failure(self):
+        app = AsgiFunctionApp(app=object())
+        app.middleware.notify_startup = mock.AsyncMock(
+            side_effect=[False, ValueError('boom'), True])
+        app.middleware.notify_shutdown = mock.AsyncMock()
+        app.middleware.handle_async = mock.AsyncMock(return_value='resp')
+        http_func = app.get_functions()[0].get_user_function()
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        with self.assertRaises(RuntimeError):
+            loop.run_until_complete(http_func(mock.Mock(), mock.Mock()))
+        with self.assertRaises(ValueError):
+            loop.run_until_complete(http_func(mock.Mock(), mock.Mock()))
+        self.assertEqual(
+            loop.run_until_complete(http_func(mock.Mock(), mock.Mock())),
+            'resp')
+        self.assertTrue(app.startup_task_done)
+        self.assertEqual(app.middleware.notify_startup.await_count, 3)
+
+    def test_asgi_function_app_startup_on_warmup(self):
+        app = AsgiFunctionApp(app=object(), startup_on_warmup=True)
+        app.middleware.notify_startup = mock.AsyncMock(return_value=True)
+        app.middleware.notify_shutdown = mock.AsyncMock()
+        funcs = {f.get_function_name(): f for f in app.get_functions()}
+        self.assertEqual(set(funcs),
+                         {'http_app_func', 'http_app_func_warmup'})
+        warmup = funcs['http_app_func_warmup']
+        self.assertEqual(warmup.get_trigger().get_binding_name(),
+                         WARMUP_TRIGGER)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        loop.run_until_complete(warmup.get_user_function()(mock.Mock()))
+        self.assertTrue(app.startup_task_done)
+        app.middleware.notify_startup.assert_awaited_once()
+
+    def test_asgi_function_app_startup_on_warmup_user_warmup(self):
+        app = AsgiFunctionApp(app=object(), startup_on_warmup=True)
+
+        @app.function_name(name='warmup')
+        @app.warm_up_trigger('warmupContext')
+        def warmup(warmupContext):
+            pass
+
+        funcs = [f.get_function_name() for f in app.get_functions()]
+        self.assertEqual(sorted(funcs), ['http_app_func', 'warmup'])
+
+    def test_asgi_function_app_shutdown_drains_requests(self):
+        app = AsgiFunctionApp(app=object())
+        events = []
+
+        async def handle_async(req, context):
+            await asyncio.sleep(0.05)
+            events.append('response')
+            return 'resp'
+
+        async def notify_shutdown():
+            events.append('shutdown')
+
+        app.middleware.notify_startup = mock.AsyncMock(return_value=True)
+        app.middleware.notify_shutdown = notify_shutdown
+        app.middleware.handle_async = handle_async
+        http_func = app.get_functions()[0].get_user_function()
+
+        async def run():
+            request = asyncio.ensure_future(
+                http_func(mock.Mock(), mock.Mock()))
+            await asyncio.sleep(0.01)
+            await app.shutdown()
+            with self.assertRaises(RuntimeError):
+                await http_func(mock.Mock(), mock.Mock())
+            return await request
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        self.assertEqual(loop.run_until_complete(run()), 'resp')
+        self.assertEqual(events, ['response', 'shutdown'])
+
     def test_wsgi_function_app_default(self):
         app = WsgiFunctionApp(app=object())
         self.assertEqual(app.auth_level, AuthLevel.FUNCTION)
@@ -933,6 +1048,15 @@ class TestFunctionApp(unittest.TestCase):
                               http_auth_level=AuthLevel.ANONYMOUS)
         self.assertEqual(app.auth_level, AuthLevel.ANONYMOUS)
 
+    @mock.patch('azure.functions.decorators.function_app.WsgiFunctionApp'
+                '._add_http_app')
+    def test_wsgi_function_app_multithread(self, add_http_app_mock):
+        WsgiFunctionApp(app=object(), multithread=True, max_workers=4)
+
+        middleware = add_http_app_mock.call_args[0][0]
+        self.assertTrue(middleware._multithread)
+        self.assertEqual(middleware._max_workers, 4)
+
     def test_wsgi_function_app_is_http_function(self):
         app = WsgiFunctionApp(
             app=object(),
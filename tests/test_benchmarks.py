@@ -0,0 +1,232 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Opt-in micro-benchmarks for the hot paths of the library.
+
+They are skipped unless the AZURE_FUNCTIONS_BENCHMARKS environment variable
+is set, e.g.
+
+    AZURE_FUNCTIONS_BENCHMARKS=1 python -m pytest -s tests/test_benchmarks.py
+
+Timings are printed, the assertions only guard against regressions that
+are orders of magnitude off, so they hold on slow or busy machines.
+"""
+
+import asyncio
+import datetime
+import io
+import json
+import os
+import time
+import tracemalloc
+import unittest
+from io import StringIO
+from typing import Callable, Dict
+
+import azure.functions as func
+import azure.functions.servicebus as azf_sb
+from azure.functions import meta
+from azure.functions._http_asgi import AsgiMiddleware
+from azure.functions._http_wsgi import WsgiRequest
+from azure.functions.blob import InputStream
+from tests.utils.testutils import CollectionSint64, CollectionString
+
+BENCHMARKS_ENABLED = bool(os.environ.get('AZURE_FUNCTIONS_BENCHMARKS'))
+
+
+def _timeit(fn: Callable[[], object], number: int) -> float:
+    """Return the best time per call in seconds out of three runs."""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _report(name: str, value: float, unit: str = 'us') -> None:
+    scale = {'s': 1, 'ms': 1e3, 'us': 1e6}[unit]
+    print(f'\n{name}: {value * scale:.2f} {unit}')
+
+
+@unittest.skipUnless(BENCHMARKS_ENABLED,
+                     'set AZURE_FUNCTIONS_BENCHMARKS=1 to run benchmarks')
+class TestBenchmarks(unittest.TestCase):
+
+    def _generate_func_request(self) -> func.HttpRequest:
+        return func.HttpRequest(
+            method='POST',
+            url='https://function.azurewebsites.net/api/http?firstname=rt',
+            headers={
+                'Content-Type': 'application/json',
+                'x-ms-site-restricted-token': 'xmsrt'
+            },
+            params={'firstname': 'roger'},
+            route_params={},
+            body=b'{ "lastname": "tsang" }'
+        )
+
+    def _generate_servicebus_batch(self, size: int) -> Dict[str, meta.Datum]:
+        enqueued_time = '2020-07-14T01:39:41.5000000Z'
+        return {
+            'UserPropertiesArray': meta.Datum(
+                json.dumps([{'index': i} for i in range(size)]), 'json'),
+            'MessageIdArray': meta.Datum(
+                CollectionString([f'message-{i}' for i in range(size)]),
+                'collection_string'),
+            'SequenceNumberArray': meta.Datum(
+                CollectionSint64(list(range(size))), 'collection_sint64'),
+            'EnqueuedTimeUtcArray': meta.Datum(
+                json.dumps([enqueued_time] * size), 'json'),
+        }
+
+    def test_asgi_disconnect_resume_latency(self):
+        # user-001: the disconnect waiter used to poll every 100 ms
+        resumed_after = []
+
+        async def app(scope, receive, send):
+            await receive()
+
+            async def wait_for_disconnect():
+                await receive()
+                resumed_after.append(time.perf_counter() - sent_at)
+
+            listener = asyncio.ensure_future(wait_for_disconnect())
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [[b'content-type', b'text/plain']],
+            })
+            await asyncio.sleep(0)
+            sent_at = time.perf_counter()
+            await send({'type': 'http.response.body', 'body': b'done'})
+            await listener
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        middleware = AsgiMiddleware(app)
+        for _ in range(20):
+            loop.run_until_complete(
+                middleware.handle_async(self._generate_func_request()))
+
+        latency = max(resumed_after)
+        _report('asgi disconnect resume latency (max of 20)', latency, 'ms')
+        self.assertLess(latency, 0.05)
+
+    def test_wsgi_environ_template(self):
+        # user-009: environs are copied from a prebuilt template
+        request = self._generate_func_request()
+        template = WsgiRequest.build_environ_template()
+
+        untemplated = _timeit(
+            lambda: WsgiRequest(request).to_environ(StringIO()), 2000)
+        templated = _timeit(
+            lambda: WsgiRequest(request).to_environ(StringIO(), template),
+            2000)
+
+        _report('wsgi to_environ without template', untemplated)
+        _report('wsgi to_environ with template', templated)
+        self.assertLess(templated, untemplated * 2)
+
+    def test_servicebus_batch_decode_scales_linearly(self):
+        # user-011: metadata arrays are decoded once per batch
+        per_message = {}
+        for size in (100, 1000):
+            data = meta.Datum(
+                CollectionString(['body'] * size), 'collection_string')
+            metadata = self._generate_servicebus_batch(size)
+            elapsed = _timeit(
+                lambda: azf_sb.ServiceBusMessageInConverter.decode(
+                    data, trigger_metadata=metadata), 5)
+            per_message[size] = elapsed / size
+            _report(f'servicebus batch decode per message, size {size}',
+                    per_message[size])
+
+        # a quadratic decoder would be about 10 times slower per message
+        self.assertLess(per_message[1000], per_message[100] * 3)
+
+    def test_parse_datetime_cache(self):
+        # user-013: repeated enqueue times are served from a cache
+        converter = azf_sb.ServiceBusMessageInConverter
+        base = datetime.datetime(2020, 7, 14, 1, 39, 41)
+        distinct = [
+            (base + datetime.timedelta(seconds=i)).isoformat() + '.5000000Z'
+            for i in range(5000)
+        ]
+
+        converter._parse_datetime_cached.cache_clear()
+        start = time.perf_counter()
+        for value in distinct:
+            converter._parse_datetime(value)
+        uncached = (time.perf_counter() - start) / len(distinct)
+
+        cached = _timeit(lambda: converter._parse_datetime(distinct[0]), 5000)
+
+        _report('parse datetime, cache miss', uncached)
+        _report('parse datetime, cache hit', cached)
+        self.assertLess(cached, uncached)
+
+    def test_datum_python_value_dispatch(self):
+        # user-018: python_value dispatches on the datum type through a dict
+        datums = [
+            meta.Datum('string', 'string'),
+            meta.Datum(b'bytes', 'bytes'),
+            meta.Datum(42, 'int'),
+            meta.Datum('{"json": true}', 'json'),
+            meta.Datum(CollectionString(['a', 'b']), 'collection_string'),
+        ]
+
+        def read_all():
+            for datum in datums:
+                datum.python_value
+
+        elapsed = _timeit(read_all, 5000) / len(datums)
+        _report('datum python_value', elapsed)
+        self.assertLess(elapsed, 1e-4)
+
+    def test_servicebus_message_memory(self):
+        # user-019: messages declare __slots__ and carry no __dict__
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            messages = [
+                azf_sb.ServiceBusMessage(
+                    body=b'body', message_id=str(i),
+                    application_properties={}, user_properties={})
+                for i in range(5000)
+            ]
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        allocated = sum(
+            stat.size_diff for stat in after.compare_to(before, 'filename'))
+        print(f'\n5,000 ServiceBusMessage objects: '
+              f'{allocated / 1e6:.2f} MB')
+        self.assertFalse(hasattr(messages[0], '__dict__'))
+
+    def test_blob_line_iterators_throughput(self):
+        # user-024: lines are read in chunks through one reused buffer
+        lines = 100000
+        jsonl = b''.join(
+            b'{"id": %d, "name": "row"}\n' % i for i in range(lines))
+        csv_data = b''.join(b'%d,row,"a, b"\n' % i for i in range(lines))
+        size_mb = len(jsonl) / 1e6
+
+        for name, data, iterate in (
+            ('iter_lines', jsonl, lambda s: s.iter_lines()),
+            ('iter_jsonl', jsonl, lambda s: s.iter_jsonl()),
+            ('iter_csv', csv_data, lambda s: s.iter_csv()),
+        ):
+            start = time.perf_counter()
+            count = sum(1 for _ in iterate(InputStream(data=data)))
+            elapsed = time.perf_counter() - start
+            print(f'\n{name}: {len(data) / 1e6 / elapsed:.1f} MB/s')
+            self.assertEqual(count, lines)
+
+        # reading the same content with BytesIO.readline as a baseline
+        start = time.perf_counter()
+        sum(1 for _ in io.BytesIO(jsonl))
+        print(f'\nBytesIO lines: '
+              f'{size_mb / (time.perf_counter() - start):.1f} MB/s')
@@ -1,8 +1,16 @@
 #  Copyright (c) Microsoft Corporation. All rights reserved.
 #  Licensed under the MIT License.
+import gzip
+import io
 import json
+import mmap
+import os
+import pathlib
+import tempfile
 import unittest
-from typing import Any, Dict
+import zipfile
+from typing import Any, Dict, Iterator, List
+from unittest import mock
 
 import azure.functions as func
 import azure.functions.blob as afb
@@ -40,7 +48,7 @@ class TestBlob(unittest.TestCase):
         self.assertIsNone(result.length)
         self.assertIsNone(result.uri)
         self.assertTrue(result.readable())
-        self.assertFalse(result.seekable())
+        self.assertTrue(result.seekable())
         self.assertFalse(result.writable())
 
         # Verify result content
@@ -59,7 +67,7 @@ class TestBlob(unittest.TestCase):
         self.assertIsNone(result.length)
         self.assertIsNone(result.uri)
         self.assertTrue(result.readable())
-        self.assertFalse(result.seekable())
+        self.assertTrue(result.seekable())
         self.assertFalse(result.writable())
 
         # Verify result content
@@ -180,6 +188,206 @@ class TestBlob(unittest.TestCase):
 
         self.assertEqual(result.read1(), b'blob_content')
 
+    def test_blob_seek_and_tell(self):
+        result: InputStream = InputStream(data=b'blob_content')
+
+        self.assertEqual(result.seek(5), 5)
+        self.assertEqual(result.read(3), b'con')
+        self.assertEqual(result.tell(), 8)
+        self.assertEqual(result.seek(-2, io.SEEK_CUR), 6)
+        self.assertEqual(result.seek(-3, io.SEEK_END), 9)
+        self.assertEqual(result.read(), b'ent')
+        self.assertEqual(result.read(), b'')
+
+        # Seeking past the end is allowed, like io.BytesIO
+        result.seek(100)
+        self.assertEqual(result.read(), b'')
+
+        with self.assertRaises(ValueError):
+            result.seek(-1)
+        with self.assertRaises(ValueError):
+            result.seek(0, 3)
+
+    def test_blob_readinto(self):
+        result: InputStream = InputStream(data=b'blob_content')
+        buffer = bytearray(5)
+
+        self.assertEqual(result.readinto(buffer), 5)
+        self.assertEqual(buffer, b'blob_')
+        self.assertEqual(result.readinto(memoryview(buffer)[:3]), 3)
+        self.assertEqual(buffer, b'conb_')
+        self.assertEqual(result.readinto(buffer), 4)
+        self.assertEqual(buffer[:4], b'tent')
+        self.assertEqual(result.readinto(buffer), 0)
+
+    def test_blob_getbuffer_does_not_copy(self):
+        data = bytearray(b'blob_content')
+        result: InputStream = InputStream(data=data)
+
+        view = result.getbuffer()
+        self.assertTrue(view.readonly)
+        data[0:4] = b'BLOB'
+        self.assertEqual(bytes(view[:4]), b'BLOB')
+        self.assertEqual(result.read(4), b'BLOB')
+
+    def test_blob_readline(self):
+        result: InputStream = InputStream(data=memoryview(b'a\nbc\n\nd'))
+        self.assertEqual(result.readline(), b'a\n')
+        self.assertEqual(result.readline(1), b'b')
+        self.assertEqual(list(result), [b'c\n', b'\n', b'd'])
+
+    def test_blob_readline_memoryview_windows(self):
+        data = b'x' * 10 + b'\n' + b'y' * 5
+        with mock.patch.object(afb, '_READ_CHUNK_SIZE', 4):
+            result: InputStream = InputStream(data=memoryview(data))
+            self.assertEqual(result._find(b'\n', 0), 10)
+            self.assertEqual(result._find(b'x\ny', 0), 9)
+            self.assertEqual(result._find(b'\n', 11), -1)
+            self.assertEqual(result.readline(), b'x' * 10 + b'\n')
+            self.assertEqual(result.readline(), b'y' * 5)
+
+    def test_blob_random_access(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            zip_file.writestr('a.txt', 'content a')
+            zip_file.writestr('b.txt', 'content b')
+
+        datum: Datum = Datum(value=archive.getvalue(), type='bytes')
+        result: InputStream = afb.BlobConverter.decode(
+            data=datum, trigger_metadata=None)
+        with zipfile.ZipFile(result) as zip_file:
+            self.assertEqual(zip_file.read('b.txt'), b'content b')
+
+    def test_blob_closed(self):
+        result: InputStream = InputStream(data=b'blob_content')
+        result.close()
+        with self.assertRaises(ValueError):
+            result.read()
+        with self.assertRaises(ValueError):
+            result.seek(0)
+
+    def test_blob_spill_to_mmap(self):
+        self.addCleanup(afb.set_spill_threshold, None)
+        afb.set_spill_threshold(4)
+
+        datum: Datum = Datum(value='blob_content\u00e9\nline', type='string')
+        result: InputStream = afb.BlobConverter.decode(
+            data=datum, trigger_metadata=None)
+        self.assertIsInstance(result._data, mmap.mmap)
+        self.assertEqual(result.readline(), 'blob_content\u00e9\n'.encode())
+        self.assertEqual(result.read(), b'line')
+
+        data = result._data
+        result.close()
+        self.assertTrue(data.closed)
+
+    def test_blob_spill_threshold_not_reached(self):
+        self.addCleanup(afb.set_spill_threshold, None)
+        afb.set_spill_threshold(100)
+
+        datum: Datum = Datum(value='blob_content', type='string')
+        result: InputStream = afb.BlobConverter.decode(
+            data=datum, trigger_metadata=None)
+        self.assertIsInstance(result._data, bytes)
+        self.assertEqual(result.read(), b'blob_content')
+
+    def test_blob_spill_threshold_encoded_size(self):
+        self.addCleanup(afb.set_spill_threshold, None)
+        # 6 characters, 12 bytes once encoded
+        datum: Datum = Datum(value='\u00e9' * 6, type='string')
+
+        afb.set_spill_threshold(12)
+        result: InputStream = afb.BlobConverter.decode(
+            data=datum, trigger_metadata=None)
+        self.assertIsInstance(result._data, bytes)
+
+        afb.set_spill_threshold(11)
+        result = afb.BlobConverter.decode(data=datum, trigger_metadata=None)
+        self.assertIsInstance(result._data, mmap.mmap)
+        self.assertEqual(result.read(), datum.value.encode())
+
+    def test_blob_spill_bytes_not_spilled(self):
+        self.addCleanup(afb.set_spill_threshold, None)
+        afb.set_spill_threshold(4)
+
+        # The datum keeps the bytes alive, spilling them saves no memory
+        datum: Datum = Datum(value=b'blob_content', type='bytes')
+        result: InputStream = afb.BlobConverter.decode(
+            data=datum, trigger_metadata=None)
+        self.assertIs(result._data, datum.value)
+
+    def test_blob_spill_threshold_setting(self):
+        self.assertIsNone(afb.get_spill_threshold())
+        with mock.patch.dict(os.environ,
+                             {'PYTHON_BLOB_SPILL_THRESHOLD_BYTES': '8'}):
+            self.assertEqual(afb.get_spill_threshold(), 8)
+            datum: Datum = Datum(value='blob_content', type='string')
+            result: InputStream = afb.BlobConverter.decode(
+                data=datum, trigger_metadata=None)
+            self.assertIsInstance(result._data, mmap.mmap)
+            self.assertEqual(bytes(result.getbuffer()), b'blob_content')
+
+        with self.assertRaises(ValueError):
+            afb.set_spill_threshold(-1)
+
+    def test_blob_iter_lines(self):
+        data = b'first line\r\nsecond line\n\nlast'
+        for chunk_size in (1, 3, 64):
+            result: InputStream = InputStream(data=data)
+            self.assertEqual(
+                list(result.iter_lines(chunk_size=chunk_size)),
+                [b'first line', b'second line', b'', b'last'])
+
+        result = InputStream(data=data)
+        result.seek(6)
+        self.assertEqual(list(result.iter_lines(keepends=True, chunk_size=4)),
+                         [b'line\r\n', b'second line\n', b'\n', b'last'])
+
+        with self.assertRaises(ValueError):
+            InputStream(data=data).iter_lines(chunk_size=0)
+
+    def test_blob_iter_jsonl(self):
+        data = b'{"id": 1}\n{"id": 2}\n\n{"id": 3}\n'
+        result: InputStream = InputStream(data=data)
+        self.assertEqual(list(result.iter_jsonl(chunk_size=5)),
+                         [{'id': 1}, {'id': 2}, {'id': 3}])
+
+        result = InputStream(data=data)
+        self.assertEqual(list(result.iter_jsonl(batch_size=2)),
+                         [[{'id': 1}, {'id': 2}], [{'id': 3}]])
+
+        with self.assertRaises(ValueError):
+            InputStream(data=data).iter_jsonl(batch_size=0)
+        with self.assertRaises(ValueError):
+            InputStream(data=data).iter_jsonl(chunk_size=0)
+
+    def test_blob_iter_csv(self):
+        data = 'id,text\r\n1,"multi\nline"\r\n2,caf\u00e9\r\n'.encode()
+        result: InputStream = InputStream(data=data)
+        self.assertEqual(list(result.iter_csv(chunk_size=4)),
+                         [['id', 'text'], ['1', 'multi\nline'],
+                          ['2', 'caf\u00e9']])
+
+        result = InputStream(data=b'a;b\nc;d\ne;f\n')
+        self.assertEqual(list(result.iter_csv(delimiter=';', batch_size=2)),
+                         [[['a', 'b'], ['c', 'd']], [['e', 'f']]])
+        self.assertFalse(result.closed)
+
+        with self.assertRaises(ValueError):
+            InputStream(data=data).iter_csv(batch_size=0)
+        with self.assertRaises(ValueError):
+            InputStream(data=data).iter_csv(chunk_size=-1)
+        with self.assertRaises(LookupError):
+            InputStream(data=data).iter_csv(encoding='unknown')
+
+    def test_blob_iter_csv_utf16(self):
+        text = 'id,text\r\n1,"multi\nline"\r\n2,\u010a\r\n'
+        for encoding in ('utf-16', 'utf-16-le', 'utf-32'):
+            result: InputStream = InputStream(data=text.encode(encoding))
+            self.assertEqual(
+                list(result.iter_csv(encoding=encoding, chunk_size=3)),
+                [['id', 'text'], ['1', 'multi\nline'], ['2', '\u010a']])
+
     def test_blob_output_custom_output_content(self):
         class CustomOutput:
             def read(self) -> bytes:
@@ -214,12 +422,54 @@ class TestBlob(unittest.TestCase):
         self.assertEqual(result.value, b'blob_output_bytes')
         self.assertEqual(result.type, 'bytes')
 
+    def test_blob_output_iterator(self):
+        def chunks():
+            yield b'blob_'
+            yield bytearray(b'output_')
+            yield 'chunks'
+
+        result: Datum = afb.BlobConverter.encode(obj=chunks(),
+                                                 expected_type=None)
+        self.assertEqual(result.type, 'bytes')
+        self.assertEqual(result.value, b'blob_output_chunks')
+
+        with self.assertRaises(NotImplementedError):
+            afb.BlobConverter.encode(obj=iter([1, 2]), expected_type=None)
+
+    def test_blob_output_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'output.bin'
+            path.write_bytes(b'blob_output_path')
+            result: Datum = afb.BlobConverter.encode(obj=path,
+                                                     expected_type=None)
+        self.assertEqual(result.type, 'bytes')
+        self.assertEqual(result.value, b'blob_output_path')
+
+    def test_blob_output_compressed(self):
+        with mock.patch.object(afb, '_OUTPUT_CHUNK_SIZE', 4):
+            for content in (b'blob_output', 'blob_output',
+                            io.BytesIO(b'blob_output'),
+                            iter([b'blob_', 'output'])):
+                result: Datum = afb.BlobConverter.encode(
+                    obj=afb.CompressedOutput(content), expected_type=None)
+                self.assertEqual(result.type, 'bytes')
+                self.assertEqual(gzip.decompress(result.value),
+                                 b'blob_output')
+
+        with self.assertRaises(ValueError):
+            afb.CompressedOutput(b'blob_output', compression='zstd')
+
     def test_blob_output_type(self):
         check_output_type = afb.BlobConverter.check_output_type_annotation
         self.assertTrue(check_output_type(str))
         self.assertTrue(check_output_type(bytes))
         self.assertTrue(check_output_type(bytearray))
         self.assertTrue(check_output_type(InputStream))
+        self.assertTrue(check_output_type(pathlib.Path))
+        self.assertTrue(check_output_type(afb.CompressedOutput))
+        self.assertTrue(check_output_type(Iterator[bytes]))
+        self.assertTrue(check_output_type(List[str]))
+        self.assertFalse(check_output_type(Iterator[int]))
 
     def test_blob_output_custom_type(self):
         class CustomOutput:
@@ -118,6 +118,13 @@ class TestCosmosdb(unittest.TestCase):
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0], None)
 
+    def test_cosmosdb_document_from_dict_without_copy(self):
+        dct = {'id': '1'}
+        self.assertIsNot(func.Document.from_dict(dct).data, dct)
+        document = func.Document.from_dict(dct, copy=False)
+        self.assertIs(document.data, dct)
+        self.assertEqual(document['id'], '1')
+
     def test_cosmosdb_input_type(self):
         check_input_type = cdb.CosmosDBConverter.check_input_type_annotation
         self.assertTrue(check_input_type(func.DocumentList))
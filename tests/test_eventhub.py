@@ -172,6 +172,48 @@ class TestEventHub(unittest.TestCase):
             result[1].iothub_metadata['connection-device-id'], 'MyTestDevice2'
         )
 
+        # Events of a list keep their IoT Hub metadata in a plain dict
+        self.assertIs(type(result[1].iothub_metadata), dict)
+        self.assertEqual(json.loads(json.dumps(result[1].iothub_metadata)),
+                         {'connection-device-id': 'MyTestDevice2'})
+
+    def test_eventhub_trigger_multiple_events_system_properties(self):
+        system_props_array = [
+            {'EnqueuedTimeUtc': '2020-07-14T01:27:55.627Z',
+             'PartitionKey': 'key', 'SequenceNumber': '47', 'Offset': 3696},
+            {'EnqueuedTimeUtc': None, 'PartitionKey': 5,
+             'SequenceNumber': 48, 'Offset': 1.5},
+        ]
+        result = azf_eh.EventHubTriggerConverter.decode(
+            data=self._generate_multiple_iothub_data('collection_string'),
+            trigger_metadata={
+                'SystemPropertiesArray': meta.Datum(
+                    json.dumps(system_props_array), 'json')
+            }
+        )
+
+        self.assertEqual(str(result[0].enqueued_time),
+                         '2020-07-14 01:27:55.627000+00:00')
+        self.assertEqual(result[0].partition_key, 'key')
+        self.assertEqual(result[0].sequence_number, 47)
+        self.assertEqual(result[0].offset, 3696)
+
+        self.assertIsNone(result[1].enqueued_time)
+        self.assertEqual(result[1].partition_key, '5')
+        self.assertEqual(result[1].sequence_number, 48)
+        # Values the converter does not type are dropped
+        self.assertIsNone(result[1].offset)
+
+        system_props_array[0]['SequenceNumber'] = 'not a number'
+        with self.assertRaises(ValueError):
+            azf_eh.EventHubTriggerConverter.decode(
+                data=self._generate_multiple_iothub_data('collection_string'),
+                trigger_metadata={
+                    'SystemPropertiesArray': meta.Datum(
+                        json.dumps(system_props_array), 'json')
+                }
+            )
+
     def test_single_eventhub_trigger_metadata_field(self):
         result = azf_eh.EventHubTriggerConverter.decode(
             data=self._generate_single_iothub_datum(),
@@ -216,6 +258,12 @@ class TestEventHub(unittest.TestCase):
             'iothub-connection-device-id'
         ], 'MyTestDevice1')
 
+        # The metadata is still a JSON serializable dict
+        self.assertIsInstance(metadata_dict, dict)
+        self.assertEqual(
+            json.loads(json.dumps(metadata_dict))['SystemPropertiesArray'],
+            metadata_dict['SystemPropertiesArray'])
+
     def test_eventhub_properties(self):
         """Test if properties from public interface _eventhub.py returns
         the correct values from metadata"""
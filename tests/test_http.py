@@ -1,5 +1,6 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
+import asyncio
 import sys
 import types
 import unittest
@@ -186,6 +187,66 @@ class TestHTTP(unittest.TestCase):
         response = func.HttpResponse(status_code=HTTPStatus.ACCEPTED)
         self.assertEqual(response.status_code, HTTPStatus.ACCEPTED.value)
 
+    def test_streaming_http_response_get_body(self):
+        response = func.StreamingHttpResponse(
+            iter(['Hello ', b'world', bytearray(b'!')]))
+        self.assertEqual(response.get_body(), b'Hello world!')
+        # The buffered body is kept once the chunks are consumed
+        self.assertEqual(list(response.iter_body()), [b'Hello world!'])
+
+    def test_streaming_http_response_iter_body(self):
+        response = func.StreamingHttpResponse(
+            (c for c in ('Hello ', 'world!')), charset='ascii')
+        self.assertEqual(list(response.iter_body()), [b'Hello ', b'world!'])
+        with self.assertRaises(RuntimeError):
+            response.get_body()
+
+    def test_streaming_http_response_async_body(self):
+        # The chunks depend on the loop that runs the function, they
+        # cannot be drained synchronously from that loop.
+        async def run():
+            queue = asyncio.Queue()
+
+            async def produce():
+                for chunk in (b'Hello ', b'world!', None):
+                    await queue.put(chunk)
+
+            async def chunks():
+                chunk = await queue.get()
+                while chunk is not None:
+                    yield chunk
+                    chunk = await queue.get()
+
+            producer = asyncio.ensure_future(produce())
+            try:
+                with self.assertRaisesRegex(TypeError, 'async iterable'):
+                    func.StreamingHttpResponse(chunks())
+            finally:
+                await producer
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        loop.run_until_complete(asyncio.wait_for(run(), timeout=5))
+
+    def test_streaming_http_response_invalid_body(self):
+        with self.assertRaises(TypeError):
+            func.StreamingHttpResponse(b'not chunked')
+
+        with self.assertRaises(TypeError):
+            func.StreamingHttpResponse(iter([1, 2])).get_body()
+
+    def test_streaming_http_response_encode_to_datum(self):
+        response = func.StreamingHttpResponse(
+            iter([b'Hello ', b'world!']), mimetype='application/json')
+        datum = http.HttpResponseConverter.encode(response,
+                                                  expected_type=None)
+
+        self.assertEqual(datum.type, 'http')
+        self.assertEqual(datum.value['body'],
+                         Datum(type='bytes', value=b'Hello world!'))
+        self.assertEqual(datum.value['headers']['content-type'].value,
+                         'application/json')
+
     def test_http_request_converter_decode(self):
         data = {
             "method": Datum("POST", "string"),
@@ -255,6 +316,40 @@ class TestHTTP(unittest.TestCase):
         )
         self.assertEqual(request.get_body(), b"test_string")
 
+    def test_http_with_string_data_encoded_lazily(self):
+        request = http.HttpRequest(
+            method='POST',
+            url='/foo',
+            headers={},
+            params={},
+            route_params={},
+            body_type="json",
+            body='{"test_key": "test_value"}'
+        )
+
+        self.assertEqual(request.get_json(), {"test_key": "test_value"})
+        self.assertIsNone(request._HttpRequest__body_bytes)
+        self.assertEqual(request.get_body(), b'{"test_key": "test_value"}')
+        self.assertIs(request.get_body(), request.get_body())
+
+    def test_http_get_body_buffer(self):
+        data = b'{"test_key": "test_value"}'
+        request = http.HttpRequest(
+            method='POST',
+            url='/foo',
+            headers={},
+            params={},
+            route_params={},
+            body_type="bytes",
+            body=data
+        )
+
+        buffer = request.get_body_buffer()
+        self.assertIsInstance(buffer, memoryview)
+        self.assertTrue(buffer.readonly)
+        self.assertIs(buffer.obj, data)
+        self.assertEqual(request.get_json(), {"test_key": "test_value"})
+
     def test_http_body_type_json(self):
         data = '{"test_key": "test_value"}'
 
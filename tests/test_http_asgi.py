@@ -4,11 +4,14 @@
 import asyncio
 import threading
 import unittest
+from unittest.mock import patch
 
 import azure.functions as func
 from azure.functions._abc import TraceContext, RetryContext
 from azure.functions._http_asgi import (
-    AsgiMiddleware
+    AsgiMiddleware,
+    AsgiRequest,
+    STREAM_QUEUE_SIZE
 )
 import pytest
 
@@ -314,3 +317,297 @@ class TestHttpAsgiMiddleware(unittest.TestCase):
             asyncio.get_event_loop().run_until_complete(
                 middleware.notify_shutdown()
             )
+
+    def test_disconnect_receive_resumes_on_final_body_chunk(self):
+        """Test an app waiting on receive() for a disconnect is woken up as
+        soon as the final body chunk is sent, instead of polling for it
+        """
+        events = []
+
+        async def app(scope, receive, send):
+            await receive()
+
+            async def wait_for_disconnect():
+                message = await receive()
+                events.append(message['type'])
+
+            listener = asyncio.ensure_future(wait_for_disconnect())
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [[b"content-type", b"text/plain"]],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": b"Hello ",
+                "more_body": True,
+            })
+            await asyncio.sleep(0)
+            self.assertFalse(listener.done())
+
+            await send({
+                "type": "http.response.body",
+                "body": b"world!",
+            })
+            await asyncio.wait_for(listener, timeout=0.05)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        req = self._generate_func_request()
+        response = loop.run_until_complete(
+            AsgiMiddleware(app).handle_async(req)
+        )
+
+        self.assertEqual(response.get_body(), b"Hello world!")
+        self.assertEqual(events, ["http.disconnect"])
+
+    def test_middleware_persistent_loop_reuses_loop(self):
+        loops = []
+
+        class LoopRecordingApplication(MockAsgiApplication):
+            async def __call__(self, scope, receive, send):
+                loops.append(asyncio.get_event_loop())
+                await super().__call__(scope, receive, send)
+
+        app = LoopRecordingApplication()
+        app.response_body = b'Hello world!'
+        middleware = AsgiMiddleware(app, persistent_loop=True)
+        try:
+            first = middleware.main(self._generate_func_request(), None)
+            second = middleware.main(self._generate_func_request(), None)
+        finally:
+            middleware.close()
+
+        self.assertEqual(first.get_body(), b'Hello world!')
+        self.assertEqual(second.get_body(), b'Hello world!')
+        # lifespan + two http requests, all on the same loop
+        self.assertEqual(len(loops), 3)
+        self.assertTrue(all(loop is loops[0] for loop in loops))
+        self.assertTrue(loops[0].is_closed())
+        self.assertTrue(app.startup_called)
+        self.assertTrue(app.shutdown_called)
+
+    def test_middleware_persistent_loop_startup_failure(self):
+        app = MockAsgiApplication(fail_startup=True)
+        middleware = AsgiMiddleware(app, persistent_loop=True)
+        try:
+            with pytest.raises(RuntimeError):
+                middleware.main(self._generate_func_request(), None)
+        finally:
+            middleware.close()
+        self.assertTrue(app.shutdown_called)
+
+    def test_middleware_persistent_loop_without_lifespan(self):
+        class RaisingApplication(MockAsgiApplication):
+            async def __call__(self, scope, receive, send):
+                if scope['type'] == 'lifespan':
+                    raise ValueError("unsupported scope")
+                await super().__call__(scope, receive, send)
+
+        class ReturningApplication(MockAsgiApplication):
+            async def __call__(self, scope, receive, send):
+                if scope['type'] == 'lifespan':
+                    return
+                await super().__call__(scope, receive, send)
+
+        for app in (RaisingApplication(), ReturningApplication()):
+            app.response_body = b'Hello world!'
+            middleware = AsgiMiddleware(app, persistent_loop=True)
+            try:
+                first = middleware.main(self._generate_func_request(), None)
+                second = middleware.main(self._generate_func_request(), None)
+            finally:
+                middleware.close()
+
+            self.assertEqual(first.get_body(), b'Hello world!')
+            self.assertEqual(second.get_body(), b'Hello world!')
+
+    def test_middleware_persistent_loop_closed_at_exit(self):
+        app = MockAsgiApplication()
+        middleware = AsgiMiddleware(app, persistent_loop=True)
+        with patch('atexit.register') as register_mock:
+            middleware.main(self._generate_func_request(), None)
+        func_, middleware_ref = register_mock.call_args[0]
+
+        func_(middleware_ref)
+        self.assertTrue(app.shutdown_called)
+        self.assertIsNone(middleware._loop)
+
+    def test_middleware_close_without_persistent_loop(self):
+        middleware = AsgiMiddleware(MockAsgiApplication())
+        middleware.close()
+        self.assertIsNone(middleware.lifespan_receive_queue)
+
+    def test_middleware_persistent_loop_stream_response(self):
+        response_started = threading.Event()
+        release_body = threading.Event()
+
+        async def app(scope, receive, send):
+            if scope['type'] == 'lifespan':
+                await receive()
+                await send({"type": "lifespan.startup.complete"})
+                await receive()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+            await receive()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [[b"content-type", b"text/plain"]],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": b"Hello ",
+                "more_body": True,
+            })
+            response_started.set()
+            while not release_body.is_set():
+                await asyncio.sleep(0.01)
+            await send({
+                "type": "http.response.body",
+                "body": b"world!",
+            })
+
+        middleware = AsgiMiddleware(app, persistent_loop=True,
+                                    stream_response=True)
+        try:
+            response = middleware.main(self._generate_func_request(), None)
+            self.assertIsInstance(response, func.StreamingHttpResponse)
+            self.assertEqual(response.status_code, 200)
+
+            chunks = response.iter_body()
+            self.assertEqual(next(chunks), b"Hello ")
+            self.assertTrue(response_started.is_set())
+            release_body.set()
+            self.assertEqual(list(chunks), [b"world!"])
+        finally:
+            release_body.set()
+            middleware.close()
+
+    def test_middleware_persistent_loop_stream_response_backpressure(self):
+        sent = []
+        app_done = threading.Event()
+
+        async def app(scope, receive, send):
+            if scope['type'] == 'lifespan':
+                await receive()
+                await send({"type": "lifespan.startup.complete"})
+                await receive()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+            await receive()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [[b"content-type", b"text/plain"]],
+            })
+            for i in range(20):
+                await send({
+                    "type": "http.response.body",
+                    "body": b"%d," % i,
+                    "more_body": True,
+                })
+                sent.append(i)
+            await send({"type": "http.response.body", "body": b""})
+            app_done.set()
+
+        middleware = AsgiMiddleware(app, persistent_loop=True,
+                                    stream_response=True)
+        try:
+            response = middleware.main(self._generate_func_request(), None)
+            # The app waits for the worker instead of queueing every chunk
+            self.assertFalse(app_done.wait(0.3))
+            self.assertLessEqual(len(sent), STREAM_QUEUE_SIZE + 1)
+
+            self.assertEqual(
+                response.get_body(),
+                b"".join(b"%d," % i for i in range(20)))
+            self.assertTrue(app_done.wait(5))
+        finally:
+            middleware.close()
+
+    def test_middleware_persistent_loop_stream_response_error(self):
+        class FailingApplication(MockAsgiApplication):
+            async def __call__(self, scope, receive, send):
+                if scope['type'] == 'http':
+                    raise ValueError("boom")
+                await super().__call__(scope, receive, send)
+
+        middleware = AsgiMiddleware(FailingApplication(),
+                                    persistent_loop=True,
+                                    stream_response=True)
+        try:
+            with pytest.raises(ValueError):
+                middleware.main(self._generate_func_request(), None)
+        finally:
+            middleware.close()
+
+    def test_middleware_stream_response_requires_persistent_loop(self):
+        with pytest.raises(ValueError):
+            AsgiMiddleware(MockAsgiApplication(), stream_response=True)
+
+    def test_middleware_request_body_chunk_size(self):
+        messages = []
+
+        async def app(scope, receive, send):
+            while True:
+                message = await receive()
+                messages.append(message)
+                if not message['more_body']:
+                    break
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": b"".join(m['body'] for m in messages),
+            })
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        body = b'0123456789' * 10 + b'abc'
+        req = self._generate_func_request(body=body)
+        response = loop.run_until_complete(
+            AsgiMiddleware(app, request_body_chunk_size=25).handle_async(req)
+        )
+
+        self.assertEqual(response.get_body(), body)
+        self.assertEqual([len(m['body']) for m in messages],
+                         [25, 25, 25, 25, 3])
+        self.assertEqual([m['more_body'] for m in messages],
+                         [True, True, True, True, False])
+        self.assertTrue(all(isinstance(m['body'], bytes) for m in messages))
+
+    def test_middleware_request_body_smaller_than_chunk_size(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        app = MockAsgiApplication()
+        req = self._generate_func_request(body=b'small body')
+        loop.run_until_complete(
+            AsgiMiddleware(app, request_body_chunk_size=1024).handle_async(req)
+        )
+
+        self.assertEqual(app.received_request['body'], b'small body')
+        self.assertFalse(app.received_request['more_body'])
+
+    def test_middleware_invalid_request_body_chunk_size(self):
+        with pytest.raises(ValueError):
+            AsgiMiddleware(MockAsgiApplication(), request_body_chunk_size=0)
+
+    def test_request_scope_from_template(self):
+        req = self._generate_func_request()
+        ctx = self._generate_func_context()
+        template = AsgiRequest.build_scope_template()
+
+        scope = AsgiRequest(req, ctx).to_asgi_http_scope()
+        templated_scope = AsgiRequest(req, ctx).to_asgi_http_scope(template)
+
+        self.assertEqual(scope, templated_scope)
+        self.assertEqual(templated_scope['scheme'], 'https')
+        self.assertIn((b'x-ms-site-restricted-token', b'xmsrt'),
+                      templated_scope['headers'])
+        self.assertNotIn('method', template)
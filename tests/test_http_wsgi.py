@@ -1,7 +1,12 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
+import asyncio
+import os
+import tempfile
 import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO, BytesIO
 
 import pytest
@@ -66,6 +71,25 @@ class TestHttpWsgi(unittest.TestCase):
         environ = WsgiRequest(func_request).to_environ(error_buffer)
         self.assertEqual(environ['HTTP_X_MS_SITE_RESTRICTED_TOKEN'], 'xmsrt')
 
+    def test_request_environ_from_template(self):
+        func_request = self._generate_func_request(headers={
+            "Content-Type": "application/json",
+            "x-ms-unicode": "Pippi L\u00e5ngstrump"
+        })
+        error_buffer = StringIO()
+        template = WsgiRequest.build_environ_template()
+
+        environ = WsgiRequest(func_request).to_environ(error_buffer)
+        templated_environ = WsgiRequest(func_request).to_environ(
+            error_buffer, template)
+
+        del environ['wsgi.input'], templated_environ['wsgi.input']
+        self.assertEqual(environ, templated_environ)
+        self.assertEqual(templated_environ['HTTP_X_MS_UNICODE'],
+                         'Pippi L\u00c3\u00a5ngstrump')
+        # The template is copied, never filled in
+        self.assertNotIn('REQUEST_METHOD', template)
+
     def test_request_has_no_query_param(self):
         func_request = self._generate_func_request(
             url="https://function.azurewebsites.net",
@@ -212,6 +236,204 @@ class TestHttpWsgi(unittest.TestCase):
         self.assertEqual(func_response.status_code, 200)
         self.assertEqual(func_response.get_body(), b'sample string')
 
+    def test_middleware_stream_response(self):
+        produced = []
+
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            for chunk in (b'sample ', b'', b'string'):
+                produced.append(chunk)
+                yield chunk
+
+        func_request = self._generate_func_request()
+        func_response = WsgiMiddleware(app, stream_response=True).handle(
+            func_request)
+
+        self.assertIsInstance(func_response, func.StreamingHttpResponse)
+        self.assertEqual(func_response.status_code, 200)
+        self.assertEqual(func_response.mimetype, 'text/plain')
+        # Only the first non-empty chunk is produced before returning
+        self.assertEqual(produced, [b'sample '])
+        self.assertEqual(list(func_response.iter_body()),
+                         [b'sample ', b'', b'string'])
+
+    def test_middleware_stream_response_with_server_error_status_code(self):
+        app = self._generate_wsgi_app(status="500 Internal Server Error",
+                                      response_body=b'internal server error')
+        func_request = self._generate_func_request()
+        with pytest.raises(Exception) as exec_info:
+            WsgiMiddleware(app, stream_response=True).handle(func_request)
+        self.assertEqual(exec_info.value.args[0], b'internal server error')
+
+    def test_middleware_errors_are_scoped_to_request(self):
+        """Test errors written to wsgi.errors by concurrent requests are only
+        reported on the request that wrote them
+        """
+        barrier = threading.Barrier(8)
+
+        def app(environ, start_response):
+            request_id = environ['QUERY_STRING']
+            barrier.wait()
+            if int(request_id) % 2:
+                environ['wsgi.errors'].write(request_id)
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [request_id.encode()]
+
+        middleware = WsgiMiddleware(app, multithread=True)
+
+        def call(request_id):
+            func_request = self._generate_func_request(
+                url=f'https://a.b.com/api/http?{request_id}')
+            try:
+                return middleware.main(func_request, None).get_body()
+            except Exception as e:
+                return e.args[0]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(call, range(8)))
+
+        for request_id, result in enumerate(results):
+            if request_id % 2:
+                self.assertEqual(result, str(request_id))
+            else:
+                self.assertEqual(result, str(request_id).encode())
+
+    def test_middleware_reports_multithread(self):
+        environs = []
+
+        def app(environ, start_response):
+            environs.append(environ)
+            start_response('200 OK', [])
+            return [b'']
+
+        func_request = self._generate_func_request()
+        WsgiMiddleware(app).main(func_request, None)
+        WsgiMiddleware(app, multithread=True).main(func_request, None)
+
+        self.assertFalse(environs[0]['wsgi.multithread'])
+        self.assertTrue(environs[1]['wsgi.multithread'])
+
+    def test_middleware_handle_async_bounded_concurrency(self):
+        for multithread, max_workers, expected in ((False, None, 1),
+                                                   (True, 2, 2)):
+            lock = threading.Lock()
+            running = [0]
+            max_running = [0]
+
+            def app(environ, start_response):
+                with lock:
+                    running[0] += 1
+                    max_running[0] = max(max_running[0], running[0])
+                time.sleep(0.02)
+                with lock:
+                    running[0] -= 1
+                start_response('200 OK', [])
+                return [b'sample string']
+
+            middleware = WsgiMiddleware(app, multithread=multithread,
+                                        max_workers=max_workers)
+            self.addCleanup(middleware.close)
+
+            async def handle_all():
+                return await asyncio.gather(*(
+                    middleware.handle_async(self._generate_func_request())
+                    for _ in range(6)))
+
+            loop = asyncio.new_event_loop()
+            self.addCleanup(loop.close)
+            responses = loop.run_until_complete(handle_all())
+
+            self.assertEqual([r.get_body() for r in responses],
+                             [b'sample string'] * 6)
+            self.assertEqual(max_running[0], expected)
+
+    def test_middleware_serialises_sync_calls(self):
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        def app(environ, start_response):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            start_response('200 OK', [])
+            return [b'sample string']
+
+        middleware = WsgiMiddleware(app)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(executor.map(
+                lambda _: middleware.handle(self._generate_func_request()),
+                range(4)))
+
+        self.assertEqual([r.get_body() for r in responses],
+                         [b'sample string'] * 4)
+        self.assertEqual(max_running[0], 1)
+
+    def test_response_closes_app_iterable(self):
+        for stream_response in (False, True):
+            closed = []
+
+            class ClosingIterable:
+                def __init__(self, environ, start_response):
+                    start_response('200 OK', [])
+
+                def __iter__(self):
+                    yield b'sample '
+                    yield b'string'
+
+                def close(self):
+                    closed.append(True)
+
+            func_request = self._generate_func_request()
+            func_response = WsgiMiddleware(
+                ClosingIterable, stream_response=stream_response
+            ).handle(func_request)
+
+            self.assertEqual(func_response.get_body(), b'sample string')
+            self.assertEqual(closed, [True])
+
+    def test_response_file_wrapper(self):
+        content = b'0123456789' * 2000
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        opened = []
+
+        def app(environ, start_response):
+            file = open(f.name, 'rb')
+            file.seek(5)
+            opened.append(file)
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return environ['wsgi.file_wrapper'](file, 4096)
+
+        for stream_response in (False, True):
+            func_request = self._generate_func_request()
+            func_response = WsgiMiddleware(
+                app, stream_response=stream_response
+            ).handle(func_request)
+            self.assertEqual(func_response.get_body(), content[5:])
+
+        self.assertTrue(all(file.closed for file in opened))
+
+    def test_response_file_wrapper_not_a_file(self):
+        body = BytesIO(b'sample string')
+
+        def app(environ, start_response):
+            start_response('200 OK', [])
+            return environ['wsgi.file_wrapper'](body, 4)
+
+        func_request = self._generate_func_request()
+        func_response = WsgiMiddleware(app, stream_response=True).handle(
+            func_request)
+
+        self.assertEqual(list(func_response.iter_body()),
+                         [b'samp', b'le s', b'trin', b'g'])
+        self.assertTrue(body.closed)
+
     def test_path_encoding_utf8(self):
         url = 'http://example.com/Pippi%20L%C3%A5ngstrump'
         request = AsgiRequest(self._generate_func_request(url=url))
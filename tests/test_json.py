@@ -0,0 +1,91 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import json
+import unittest
+
+import azure.functions as func
+import azure.functions.queue as azf_q
+import azure.functions.timer as azf_t
+from azure.functions import _json
+from azure.functions.meta import Datum
+
+
+class RecordingCodec(func.JsonCodec):
+    name = 'recording'
+
+    def __init__(self):
+        self.calls = []
+
+    def loads(self, data):
+        self.calls.append(('loads', data))
+        return super().loads(data)
+
+    def dumps(self, obj):
+        self.calls.append(('dumps', obj))
+        return super().dumps(obj)
+
+
+class TestJsonCodec(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(func.set_json_codec, None)
+
+    def test_default_codec(self):
+        codec = func.get_json_codec()
+        self.assertIs(type(codec), func.JsonCodec)
+        self.assertEqual(codec.name, 'json')
+        self.assertEqual(codec.loads(b'{"a": [1, 2]}'), {'a': [1, 2]})
+        self.assertEqual(codec.dumps({'a': 1}), json.dumps({'a': 1}))
+        self.assertEqual(codec.dumps_bytes({'a': 1}), b'{"a": 1}')
+
+    def test_set_custom_codec(self):
+        codec = RecordingCodec()
+        self.assertIs(func.set_json_codec(codec), codec)
+        self.assertIs(func.get_json_codec(), codec)
+
+        self.assertEqual(Datum('{"a": 1}', 'json').python_value, {'a': 1})
+        self.assertEqual(codec.calls, [('loads', '{"a": 1}')])
+
+    def test_converters_use_codec(self):
+        codec = func.set_json_codec(RecordingCodec())
+
+        datum = azf_q.QueueMessageOutConverter.encode(
+            ['a', 'b'], expected_type=None)
+        self.assertEqual(datum.type, 'json')
+        self.assertEqual(json.loads(datum.value), ['a', 'b'])
+
+        timer = azf_t.TimerRequestConverter.decode(
+            Datum('{"IsPastDue": true}', 'json'), trigger_metadata={})
+        self.assertTrue(timer.past_due)
+
+        self.assertIn(('dumps', ['a', 'b']), codec.calls)
+        self.assertIn(('loads', '{"IsPastDue": true}'), codec.calls)
+
+    def test_reset_codec(self):
+        func.set_json_codec(RecordingCodec())
+        codec = func.set_json_codec(None)
+        self.assertIs(type(codec), func.JsonCodec)
+
+    def test_orjson_codec(self):
+        try:
+            import orjson  # NoQA
+        except ImportError:
+            raise unittest.SkipTest('orjson module is missing')
+
+        codec = func.set_json_codec('orjson')
+        self.assertEqual(codec.name, 'orjson')
+        self.assertEqual(_json.loads(b'{"a": [1, 2]}'), {'a': [1, 2]})
+        self.assertEqual(_json.dumps({'a': 1}), '{"a":1}')
+        self.assertEqual(_json.dumps_bytes({'a': 1}), b'{"a":1}')
+        with self.assertRaises(ValueError):
+            _json.loads(b'{')
+
+    def test_auto_codec(self):
+        codec = func.set_json_codec('auto')
+        self.assertIn(codec.name, ('json', 'orjson', 'msgspec', 'ujson'))
+        self.assertEqual(_json.loads('[1]'), [1])
+
+    def test_unsupported_codec(self):
+        with self.assertRaises(ValueError):
+            func.set_json_codec('simplejson')
+        self.assertEqual(func.get_json_codec().name, 'json')
@@ -200,6 +200,40 @@ class Kafka(unittest.TestCase):
         sys_dict = json.loads(sys)
         self.assertEqual(sys_dict['MethodName'], 'KafkaTriggerMany')
 
+    def test_kafka_trigger_missing_offsets(self):
+        trigger_metadata = self._generate_multiple_trigger_metadata()
+        del trigger_metadata['OffsetArray']
+        result = azf_ka.KafkaTriggerConverter.decode(
+            data=self._generate_multiple_kafka_data('collection_string'),
+            trigger_metadata=trigger_metadata
+        )
+        self.assertEqual([e.offset for e in result], [None, None])
+
+    def test_kafka_batch_events_share_metadata(self):
+        result = azf_ka.KafkaTriggerConverter.decode(
+            data=self._generate_multiple_kafka_data('collection_string'),
+            trigger_metadata=self._generate_multiple_trigger_metadata()
+        )
+        self.assertIs(result[0].metadata, result[1].metadata)
+        self.assertEqual(json.loads(result[1].metadata['sys'])['MethodName'],
+                         'KafkaTriggerMany')
+
+    def test_kafka_header_map(self):
+        result = azf_ka.KafkaTriggerConverter.decode(
+            data=self._generate_multiple_kafka_data('collection_string'),
+            trigger_metadata=self._generate_multiple_trigger_metadata()
+        )
+        self.assertEqual(result[0].header_map, {'test': b'1'})
+        self.assertIs(result[0].header_map, result[0].header_map)
+
+        event = func.KafkaEvent(body=b'', headers=[
+            {'Key': 'a', 'Value': 'aGVsbG8='},
+            {'Key': 'b', 'Value': None},
+            {'Key': 'a', 'Value': 'd29ybGQ='},
+        ])
+        self.assertEqual(event.header_map, {'a': b'world', 'b': b''})
+        self.assertEqual(func.KafkaEvent(body=b'').header_map, {})
+
     def test_kafka_convert_single_event_str(self):
         datum = meta.Datum("dummy_body", "string")
         result = azf_ka.KafkaConverter.decode(
@@ -2,10 +2,14 @@
 # Licensed under the MIT License.
 
 from typing import Mapping, List
+import json
 import unittest
 import datetime
+from unittest.mock import patch
 
+import azure.functions as func
 from azure.functions import meta
+from tests.utils.testutils import CollectionString
 
 
 class TestMeta(unittest.TestCase):
@@ -152,6 +156,49 @@ class TestMeta(unittest.TestCase):
 
         self.assertIn(malformed_local, str(context.exception))
 
+    def test_iso_datetime_fast_path_matches_formats(self):
+        for datetime_str in ('2018-12-12T03:16:34Z',
+                             '2018-12-12T03:16:34.2191Z',
+                             '2018-12-12T03:16:34.2191-00:00',
+                             '9999-12-31T23:59:59.999999+00:00',
+                             '2018-12-12T03:16:34',
+                             '2018-12-12T03:16:34.2191'):
+            parsed = meta._BaseConverter._parse_datetime_iso(datetime_str)
+            utc_time, _ = meta._BaseConverter._parse_datetime_utc(
+                datetime_str)
+            if utc_time is not None:
+                expected = utc_time.replace(tzinfo=datetime.timezone.utc)
+            else:
+                expected, _ = meta._BaseConverter._parse_datetime_local(
+                    datetime_str)
+            self.assertEqual(parsed, expected)
+            self.assertEqual(parsed.tzinfo, expected.tzinfo)
+
+    def test_iso_datetime_fast_path_fallback(self):
+        # Shapes and values left to the strptime formats
+        for datetime_str in ('2022-1-12T03:16:34Z',
+                             '12/31/9999 23:59:59Z',
+                             '2018-12-12t03:16:34z',
+                             '2018-02-30T03:16:34Z'):
+            self.assertIsNone(
+                meta._BaseConverter._parse_datetime_iso(datetime_str))
+
+        self.assertEqual(str(self._parse_datetime('2022-1-12T03:16:34Z')),
+                         '2022-01-12 03:16:34+00:00')
+        with self.assertRaises(ValueError):
+            self._parse_datetime('2018-02-30T03:16:34Z')
+
+    def test_parse_datetime_cached(self):
+        parsed = self._parse_datetime('2018-12-12T03:16:34.2191Z')
+        self.assertIs(self._parse_datetime('2018-12-12T03:16:34.2191Z'),
+                      parsed)
+
+    def test_datum_slots(self):
+        datum = meta.Datum(value=1, type='int')
+        self.assertFalse(hasattr(datum, '__dict__'))
+        with self.assertRaises(AttributeError):
+            datum.other = 1
+
     def test_datum_single_level_python_value(self):
         datum: Mapping[str, meta.Datum] = meta.Datum(value=None, type="int")
         self.assertEqual(datum.python_value, None)
@@ -202,6 +249,59 @@ class TestMeta(unittest.TestCase):
         self.assertListEqual(datum.python_value, [1234567, 8901234])
         self.assertEqual(datum.python_type, list)
 
+    def test_datum_value_dict(self):
+        decoded = []
+
+        class RecordingDatum(meta.Datum):
+            @property
+            def python_value(self):
+                decoded.append(self.value)
+                return super().python_value
+
+        datums = {
+            'Array': RecordingDatum(
+                value=CollectionString(['a', 'b']), type='collection_string'),
+            'Json': RecordingDatum(value='{"a": 1}', type='json'),
+        }
+        values = meta._DatumValueDict(datums)
+
+        self.assertIsInstance(values, dict)
+        self.assertEqual(len(values), 2)
+        self.assertIn('Array', values)
+        self.assertEqual(decoded, [])
+
+        self.assertEqual(values['Json'], {'a': 1})
+        self.assertEqual(values.get('Json'), {'a': 1})
+        self.assertEqual(len(decoded), 1)
+
+        self.assertEqual(json.loads(json.dumps(values)),
+                         {'Array': ['a', 'b'], 'Json': {'a': 1}})
+        self.assertEqual(values, {'Array': ['a', 'b'], 'Json': {'a': 1}})
+        self.assertEqual({'Array': ['a', 'b'], 'Json': {'a': 1}}, values)
+        self.assertEqual(dict(values), {'Array': ['a', 'b'], 'Json': {'a': 1}})
+        self.assertEqual(len(decoded), 2)
+
+    def test_datum_json_python_value_memoised(self):
+        datum = meta.Datum(value='"a string"', type='json')
+        with patch.object(meta._json, 'loads',
+                          wraps=meta._json.loads) as loads_mock:
+            self.assertEqual(datum.python_value, 'a string')
+            self.assertEqual(datum.python_value, 'a string')
+            loads_mock.assert_called_once()
+
+        datum.value = '1'
+        self.assertEqual(datum.python_value, 1)
+
+    def test_datum_json_python_value_not_shared(self):
+        datum = meta.Datum(value='{"a": [1]}', type='json')
+        value = datum.python_value
+        value['a'].append(2)
+        value['b'] = 3
+
+        self.assertEqual(datum.python_value, {'a': [1]})
+        self.assertIsNot(datum.python_value, datum.python_value)
+        self.assertEqual(datum.python_type, dict)
+
     def test_datum_json_python_value(self):
         # None
         datum = meta.Datum(value='null',
@@ -249,6 +349,67 @@ class TestMeta(unittest.TestCase):
             "value": "cool"})
         self.assertEqual(datum.python_type, dict)
 
+    def test_binding_registry_annotation_checks(self):
+        registry = func.get_binding_registry()
+        self.assertTrue(registry.check_input_annotation(
+            'queueTrigger', func.QueueMessage))
+        self.assertFalse(registry.check_input_annotation(
+            'queueTrigger', int))
+        self.assertTrue(registry.check_output_annotation('queue', str))
+        self.assertTrue(registry.check_input_annotation(
+            'eventHubTrigger', List[func.EventHubEvent]))
+        self.assertFalse(registry.check_input_annotation('unknown', str))
+        # Input only converters do not support outputs
+        self.assertFalse(registry.check_output_annotation(
+            'timerTrigger', str))
+
+    def test_binding_registry_annotation_checks_memoised(self):
+        registry = func.get_binding_registry()
+        converter = registry.get('blob')
+        self.addCleanup(registry._annotation_checks.clear)
+        with patch.object(converter, 'check_input_type_annotation',
+                          return_value=True) as check_mock, \
+                patch.object(converter, 'check_output_type_annotation',
+                             return_value=True):
+            self.assertEqual(
+                registry.precompile([('blob', 'annotation', False),
+                                     ('blob', 'annotation', False),
+                                     ('blob', 'annotation', True)]),
+                [True, True, True])
+            self.assertTrue(registry.check_input_annotation(
+                'blob', 'annotation'))
+        check_mock.assert_called_once_with('annotation')
+
+    def test_binding_registry_annotation_checks_new_binding(self):
+        registry = func.get_binding_registry()
+        self.addCleanup(registry._bindings.pop, 'testBinding', None)
+        self.addCleanup(registry._annotation_checks.clear)
+        registry.check_input_annotation('blob', str)
+        self.assertTrue(registry._annotation_checks)
+
+        self.assertFalse(registry.check_input_annotation('testBinding', str))
+
+        class TestConverter(meta.InConverter, binding='testBinding'):
+            @classmethod
+            def check_input_type_annotation(cls, pytype):
+                return pytype is str
+
+        self.assertEqual(registry._annotation_checks, {})
+        self.assertTrue(registry.check_input_annotation('testBinding', str))
+
+    def test_binding_registry_annotation_checks_bounded(self):
+        registry = func.get_binding_registry()
+        self.addCleanup(registry._annotation_checks.clear)
+        registry._annotation_checks.clear()
+
+        registry.check_input_annotation('unknown', str)
+        self.assertEqual(registry._annotation_checks, {})
+
+        with patch.object(meta, '_ANNOTATION_CHECKS_SIZE', 2):
+            for pytype in (str, bytes, int, float):
+                registry.check_input_annotation('blob', pytype)
+        self.assertEqual(len(registry._annotation_checks), 2)
+
     def _parse_datetime(self, datetime_str):
         return meta._BaseConverter._parse_datetime(datetime_str)
 
@@ -250,6 +250,12 @@ class TestMySql(unittest.TestCase):
                           obj=mysqlRowListList,
                           expected_type=None)
 
+    def test_mysqlrow_from_dict_without_copy(self):
+        dct = {'id': '1'}
+        row = func.MySqlRow.from_dict(dct, copy=False)
+        self.assertIs(row.data, dct)
+        self.assertEqual(row['id'], '1')
+
     def test_mysql_input_type(self):
         check_input_type = mysql.MySqlConverter.check_input_type_annotation
         self.assertTrue(check_input_type(func.MySqlRowList),
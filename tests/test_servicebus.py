@@ -4,6 +4,7 @@
 from typing import Dict, List
 import json
 import unittest
+from unittest.mock import patch
 from datetime import datetime, timedelta, date
 
 import azure.functions as func
@@ -202,6 +203,21 @@ class TestServiceBus(unittest.TestCase):
                          transaction_partition_key)
         self.assertEqual(sb_message.user_properties, user_properties)
 
+    def test_servicebus_message_slots(self):
+        msg = azf_sb.ServiceBusMessageInConverter.decode(
+            data=self._generate_single_servicebus_data(),
+            trigger_metadata=self._generate_single_trigger_metadata())
+        self.assertFalse(hasattr(msg, '__dict__'))
+
+        class CustomMessage(azf_sb.ServiceBusMessage):
+            pass
+
+        custom_msg = CustomMessage(body=b'body', application_properties={},
+                                   message_id='id', user_properties={})
+        custom_msg.custom = True
+        self.assertEqual(custom_msg.message_id, 'id')
+        self.assertEqual(custom_msg.get_body(), b'body')
+
     def test_abstract_servicebus_message(self):
         test_sb_message = func.ServiceBusMessage()
         abstract_sb_message = func._abc.ServiceBusMessage
@@ -336,6 +352,27 @@ class TestServiceBus(unittest.TestCase):
             'x-opt-enqueue-sequence-number': 0
         })
 
+    def test_servicebus_properties_decoded_lazily(self):
+        with patch.object(azf_sb.ServiceBusMessageInConverter,
+                          '_decode_message_field',
+                          wraps=azf_sb.ServiceBusMessageInConverter
+                          ._decode_message_field) as decode_mock:
+            msg = azf_sb.ServiceBusMessageInConverter.decode(
+                data=self._generate_single_servicebus_data(),
+                trigger_metadata=self._generate_single_trigger_metadata())
+            self.assertEqual(msg.get_body(), b'{"lucky_number": 23}')
+            decode_mock.assert_not_called()
+
+            self.assertEqual(msg.message_id, self.MOCKED_MESSAGE_ID)
+            self.assertEqual(msg.message_id, self.MOCKED_MESSAGE_ID)
+            self.assertEqual(msg.expiration_time, msg.expires_at_utc)
+            self.assertEqual(msg.scheduled_enqueue_time,
+                             msg.scheduled_enqueue_time_utc)
+
+        self.assertIsInstance(msg, func.ServiceBusMessage)
+        # Each property is decoded once, aliases share the decoded value
+        self.assertEqual(decode_mock.call_count, 3)
+
     def test_servicebus_metadata(self):
         # Trigger metadata should contains all the essential information
         # about this service bus message
@@ -390,6 +427,24 @@ class TestServiceBus(unittest.TestCase):
         # The decoding result should contain a list of message
         self.assertEqual(len(servicebus_msgs), 3)
 
+    def test_multiple_servicebus_trigger_metadata_not_shared(self):
+        servicebus_msgs = azf_sb.ServiceBusMessageInConverter.decode(
+            data=self._generate_multiple_service_bus_data(),
+            trigger_metadata=self._generate_multiple_trigger_metadata()
+        )
+        user_properties = servicebus_msgs[1].metadata['UserPropertiesArray']
+
+        servicebus_msgs[0].metadata['UserPropertiesArray'].append('added')
+        servicebus_msgs[0].metadata['UserPropertiesArray'][0].clear()
+
+        self.assertEqual(
+            servicebus_msgs[1].metadata['UserPropertiesArray'],
+            user_properties)
+        self.assertNotIn(
+            'added', servicebus_msgs[2].metadata['UserPropertiesArray'])
+        self.assertTrue(
+            servicebus_msgs[2].metadata['UserPropertiesArray'][0])
+
     def test_multiple_servicebus_trigger_non_existing_properties(self):
         servicebus_msgs = azf_sb.ServiceBusMessageInConverter.decode(
             data=self._generate_multiple_service_bus_data(),
@@ -423,6 +478,41 @@ class TestServiceBus(unittest.TestCase):
         self.assertEqual(servicebus_msgs[1].user_properties['UserId'], 2)
         self.assertEqual(servicebus_msgs[2].user_properties['UserId'], 3)
 
+    def test_multiple_servicebus_trigger_parses_arrays_once(self):
+        trigger_metadata = self._generate_multiple_trigger_metadata()
+        json_arrays = sum(1 for d in trigger_metadata.values()
+                          if d.type == 'json')
+
+        with patch.object(azf_sb._json, 'loads',
+                          side_effect=json.loads) as loads_mock:
+            servicebus_msgs = azf_sb.ServiceBusMessageInConverter.decode(
+                data=self._generate_multiple_service_bus_data(),
+                trigger_metadata=trigger_metadata
+            )
+
+        self.assertEqual(len(servicebus_msgs), 3)
+        # The message bodies and each json metadata array are parsed once
+        self.assertEqual(loads_mock.call_count, json_arrays + 1)
+
+    def test_multiple_servicebus_trigger_short_arrays(self):
+        servicebus_msgs = azf_sb.ServiceBusMessageInConverter.decode(
+            data=self._generate_multiple_service_bus_data(),
+            trigger_metadata={
+                'CorrelationIdArray': meta.Datum(
+                    type='collection_string', value=CollectionString([])),
+                'SequenceNumberArray': meta.Datum(
+                    type='collection_sint64', value=CollectionSint64([1])),
+                'UserPropertiesArray': meta.Datum(
+                    type='json', value='[{}, {}, {}]')
+            }
+        )
+
+        self.assertEqual(len(servicebus_msgs), 3)
+        self.assertEqual([m.sequence_number for m in servicebus_msgs],
+                         [1, None, None])
+        self.assertEqual([m.correlation_id for m in servicebus_msgs],
+                         [None, None, None])
+
     def test_multiple_servicebus_trigger_properties(self):
         # When cardinality is turned on to 'many', metadata should contain
         # information for all messages
@@ -249,6 +249,12 @@ class TestSql(unittest.TestCase):
                           obj=sqlRowListList,
                           expected_type=None)
 
+    def test_sqlrow_from_dict_without_copy(self):
+        dct = {'id': '1'}
+        row = func.SqlRow.from_dict(dct, copy=False)
+        self.assertIs(row.data, dct)
+        self.assertEqual(row['id'], '1')
+
     def test_sql_input_type(self):
         check_input_type = sql.SqlConverter.check_input_type_annotation
         self.assertTrue(check_input_type(func.SqlRowList),